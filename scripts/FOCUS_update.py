@@ -21,6 +21,9 @@ schema = [
     {"name": "time", "type": "TIME"},
 ]
 
+# The table is partitioned by day on this column; provisioning sets it up.
+partitionColumn = "date"
+
 # Mapping of original column names to new names
 column_mappings = {
     "Swipe_Time": "swipe_time",
@@ -33,6 +36,8 @@ column_mappings = {
     "Textbox6": "student_tardy_count",
 }
 
+projectColumns = compileProjection(schema, column_mappings)
+
 # Get the entry ID from the user
 def getEntryID():
     # entryID = input(Fore.CYAN + "Enter the entry ID for this roster YYYYMMDDX: ")
@@ -54,63 +59,26 @@ def cleanData(df):
 
     print("Cleaning data...")
 
-    # Rename columns based on predefined mappings
-    df.rename(columns=column_mappings, inplace=True, errors="raise")
-
     # Convert swipe_time to date and time columns. Time is given as 24-hour format HH:MM:SS, and should stay that way.
     # Example: "2023-08-30 08:15:00"
-    dt = pd.to_datetime(df["swipe_time"].astype(str).str.strip(), errors="coerce")
-    df["date"] = dt.dt.date
-    df["time"] = dt.dt.time
-
-    # Drop unnecessary columns
-    df.drop(columns=["swipe_time", "division","row_number", "student_tardy_count"], inplace=True, errors="ignore")
-
-    # Convert id, row_number, and student_tardy_count to integers
-    df["id"] = df["id"].astype(int)
-
-    # Convert name, status, and period to strings
-    df["name"] = df["name"].astype(str)
-    df["status"] = df["status"].astype(str)
-    df["period"] = df["period"].astype(str)
-
-    # Convert date and time to date and time types
-    # Time should be given as 24-hour format HH:MM:SS
-    # df["date"] = pd.to_datetime(df["date"], errors="coerce").dt.date
-    # df["time"] = pd.to_datetime(df["time"], format="%H:%M:%S", errors="coerce").dt.time
-
-    # add entryID
-    df["entryID"] = getEntryID()
+    dt = parseDateTimes(df["Swipe_Time"])
 
-    # reorder columns
-    df = df[["entryID", "id", "name", "status", "period", "date", "time"]]
+    # Rename, add entryID, cast and order the columns in one pass; the
+    # division, row number and tardy count columns are left out
+    df = projectColumns(df, entryID=getEntryID(), date=dt.dt.date, time=dt.dt.time)
 
     return df
 
 
-def find_csv_file(folder_path):
+def prepareCSVFile(csv_path):
     """
-    Finds the first .csv file in the given folder path.
-    Returns the file path if found, otherwise returns None.
+    Opens a CSV file past its first three (title) lines, so readCSV parses it
+    from the header row. The file itself is left as it is.
     """
-    for file in os.listdir(folder_path):
-        if file.endswith(".csv"):
-            return os.path.join(folder_path, file)
-    return None
-
-
-def prepareCSVFile(source_folder):
-
-    csv_path = find_csv_file(source_folder)
-
-    """
-    Removes the first three lines from a CSV file.
-    """
-    with open(csv_path, "r") as file:
-        data = file.readlines()[3:]
-
-    with open(csv_path, "w") as file:
-        file.writelines(data)
+    file = open(csv_path, "rb")
+    for _ in range(3):
+        file.readline()
+    return file
 
 
 def doWork():
@@ -119,21 +87,30 @@ def doWork():
     """
     print(f"Starting {scriptName} script...")
 
-    prepareCSVFile(source_folder)
+    if shouldStream(source_folder):
+        # Too large to hold at once: clean it a chunk at a time into a spool on disk
+        csv_files, cleanedData = spoolCSV(
+            source_folder, cleanData, schema, column_mappings=column_mappings, prepare=prepareCSVFile
+        )
+    else:
+        # Read in every .csv file found
+        csv_files, rawDataFrame = readCSV(
+            source_folder, column_mappings=column_mappings, tableSchema=schema, prepare=prepareCSVFile
+        )
 
-    # Read in the first .csv file found
-    csv_file, rawDataFrame = readCSV(source_folder)
+        if not csv_files:
+            return
 
-    # Clean the data
-    cleanedDataFrame = cleanData(rawDataFrame)
+        # Clean the data
+        cleanedData = cleanData(rawDataFrame)
 
-    deleteAllDataFromTable(project_id, dataset_id, table_id)
+    deleteAllDataFromTable(project_id, dataset_id, table_id, df=cleanedData)
 
     # Upload the data to BigQuery
-    uploadToBigQuery(cleanedDataFrame, schema, project_id, dataset_id, table_id)
+    uploadToBigQuery(cleanedData, schema, project_id, dataset_id, table_id)
 
     # Archive the source file
-    archiveSourceFile(cleanedDataFrame, csv_file, source_folder, table_id)
+    archiveSourceFile(cleanedData, csv_files, source_folder, table_id)
 
     print(Fore.GREEN + f"{scriptName} data pull complete.")
 
@@ -100,8 +100,11 @@ def doWork():
     temp = find_csv_file(source_folder)
     remove_first_three_lines(temp)
 
-    # Read in the first .csv file found
-    csv_file, rawDataFrame = readCSV(source_folder)
+    # Read in every .csv file found
+    csv_files, rawDataFrame = readCSV(source_folder)
+
+    if not csv_files:
+        return
 
     # Clean the data
     cleanedDataFrame = cleanData(rawDataFrame)
@@ -112,7 +115,7 @@ def doWork():
     uploadToBigQuery(cleanedDataFrame, schema, project_id, dataset_id, table_id)
 
     # Archive the source file
-    archiveSourceFile(cleanedDataFrame, csv_file, source_folder, table_id)
+    archiveSourceFile(cleanedDataFrame, csv_files, source_folder, table_id)
 
     print(Fore.GREEN + f"{scriptName} data pull complete.")
 
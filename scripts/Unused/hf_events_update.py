@@ -62,8 +62,11 @@ def doWork():
     """
     print(Fore.YELLOW + f"Starting {scriptName} script...")
 
-    # Read in the first .csv file found
-    csv_file, rawDataFrame = readCSV(source_folder)
+    # Read in every .csv file found
+    csv_files, rawDataFrame = readCSV(source_folder)
+
+    if not csv_files:
+        return
 
     # Clean the data
     cleanedDataFrame = cleanData(rawDataFrame)
@@ -75,7 +78,7 @@ def doWork():
     uploadToBigQuery(cleanedDataFrame, tableSchema, project_id, dataset_id, table_id)
 
     # Archive the source file
-    archiveSourceFile(cleanedDataFrame, csv_file, source_folder, table_id)
+    archiveSourceFile(cleanedDataFrame, csv_files, source_folder, table_id)
 
 
     print(Fore.GREEN + f"{scriptName} data pull complete.")
@@ -6,8 +6,8 @@ from _dataManager import (
     deleteAllDataFromTable,
     archiveSourceFile,
     convertToStandardDate,
+    fetchTableFromBigQuery,
 )
-from google.cloud import bigquery
 
 from colorama import init, Fore
 init(autoreset=True)
@@ -121,10 +121,8 @@ def cleanData(df):
     # get the name
     df["name"] = df["lastName"] + ", " + df["firstName"]
 
-    # Query the roster table to get a lookup DataFrame
-    client = bigquery.Client(project=project_id)
-    query = f"SELECT name, id FROM `{dataset_id}`.roster"
-    roster_df = client.query(query).to_dataframe()
+    # Read the roster table to get a lookup DataFrame
+    roster_df = fetchTableFromBigQuery(project_id, dataset_id, "roster", columns=["name", "id"])
 
     # Left join with the roster DataFrame to fill missing IDs
     df = df.merge(roster_df, on="name", how="left", suffixes=("", "_roster"))
@@ -150,8 +148,11 @@ def doWork():
     """
     print(Fore.YELLOW + f"Starting {scriptName} script...")
 
-    # Read in the first .csv file found
-    csv_file, rawDataFrame = readCSV(source_folder)
+    # Read in every .csv file found
+    csv_files, rawDataFrame = readCSV(source_folder)
+
+    if not csv_files:
+        return
 
     # Clean the data
     cleanedDataFrame = cleanData(rawDataFrame)
@@ -163,7 +164,7 @@ def doWork():
     # uploadToBigQuery(cleanedDataFrame, tableSchema, project_id, dataset_id, table_id)
    
     # Archive the source file
-    archiveSourceFile(cleanedDataFrame, csv_file, source_folder, table_id)
+    archiveSourceFile(cleanedDataFrame, csv_files, source_folder, table_id)
 
     print(Fore.GREEN + f"{scriptName} data pull complete.")
 
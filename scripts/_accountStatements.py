@@ -0,0 +1,98 @@
+"""
+Parser for the SIS billing statement export used by accountBalanceCleaner
+and accountBalances/balCleaner.
+
+The export is a run of statements, one per student, laid out as a printed
+page. Column 1 holds the page's text; the row after the
+"To the parent/guardian of:" line has the student's name in column 2, the
+student id sits in column 3 of a row near the top of the statement, and the
+"This is a current statement of your account. The total amount due is $ ..."
+line holds the balance.
+
+The file is read once and every value is found with column operations: ids
+and names are forward-filled down their statement and the balance rows are
+picked out with one regex and read with parseNumbers.
+"""
+import pandas as pd
+from colorama import Fore
+
+from _numberParsing import parseNumbers
+
+TEXT_COLUMN = 1
+NAME_COLUMN = 2
+ID_COLUMN = 3
+
+COLUMNS = ["id", "name", "balance"]
+
+STATEMENT_MARKER = "Statement Date"
+NAME_MARKER = "To the parent/guardian of:"
+BALANCE_MARKER = "This is a "
+# Captures just the amount, e.g. "$ 1,234.56", "-$12.50", "($ 12.50)" or
+# "$ (12.50)", so text after it such as "as of 9/1" or a full stop is left out.
+_NUMBER = r"(?:[\d,]+(?:\.\d+)?|\.\d+)"
+BALANCE_PATTERN = (
+    r"(?P<amount>"
+    rf"\(\s*[-+]?\s*\$\s*{_NUMBER}\s*\)"
+    rf"|[-+]?\s*\$\s*\(\s*{_NUMBER}\s*\)"
+    rf"|[-+]?\s*\$\s*[-+]?\s*{_NUMBER}"
+    r")"
+)
+
+
+def readStatementRows(csv_path):
+    """
+    Reads the text, name and id columns of the export as Arrow strings, so
+    the string searches below run in Arrow instead of row by row. Rows may
+    have any number of cells; missing ones are empty.
+    """
+    import pyarrow as pa
+
+    return pd.read_csv(
+        csv_path,
+        header=None,
+        names=range(ID_COLUMN + 1),
+        usecols=[TEXT_COLUMN, NAME_COLUMN, ID_COLUMN],
+        index_col=False,
+        dtype=pd.ArrowDtype(pa.string()),
+        skip_blank_lines=False,
+    )
+
+
+def parseRows(rows):
+    """
+    Extracts one row per balance line from the export's rows: the id and name
+    of the statement it belongs to and the amount due.
+    """
+    text = rows[TEXT_COLUMN]
+
+    # Each statement starts at its "Statement Date" line. Ids and names are
+    # only carried down within a statement, so one without them gets none.
+    statement = text.str.contains(STATEMENT_MARKER, regex=False).fillna(False).to_numpy(dtype=bool).cumsum()
+
+    # The id is the last one seen above the balance line.
+    given = rows[ID_COLUMN].dropna()
+    ids = pd.to_numeric(given.str.strip(), errors="coerce").reindex(rows.index).groupby(statement).ffill()
+
+    # The name is on the row after the marker line; carry it down its statement.
+    marker = text.str.contains(NAME_MARKER, regex=False).fillna(False).to_numpy(dtype=bool)
+    names = rows[NAME_COLUMN].shift(-1)[marker].str.strip().reindex(rows.index).groupby(statement).ffill()
+
+    # Only lines that start like a balance line go through the regex.
+    candidates = text[text.str.lstrip().str.startswith(BALANCE_MARKER).fillna(False).to_numpy(dtype=bool)]
+    amounts = candidates.str.extract(BALANCE_PATTERN, expand=False).dropna()
+    balances, malformed = parseNumbers(amounts)
+    if malformed.any():
+        print(Fore.YELLOW + f"{malformed.sum()} statement balances could not be read and were left empty.")
+
+    return pd.DataFrame({
+        "id": ids[amounts.index].astype("Int64"),
+        "name": names[amounts.index].astype(object),
+        "balance": balances,
+    }, columns=COLUMNS).reset_index(drop=True)
+
+
+def parseStatements(csv_path):
+    """
+    Parses one billing statement export into a DataFrame with COLUMNS.
+    """
+    return parseRows(readStatementRows(csv_path))
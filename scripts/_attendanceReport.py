@@ -0,0 +1,175 @@
+"""
+Parser for the SIS average daily attendance report used by the weekly and
+total attendance uploaders.
+
+The export is a sequence of sections, one per homeroom or grade. Each
+section starts with a header row whose column 6 starts with "Name" and
+names the Enrolled, Not Enrolled, Present, Excused and Not Excused columns;
+the student rows below it hold the id in column 0 and the name in column 6.
+The file is read once, row by row, and each section's values are taken from
+the columns its own header names.
+
+Large files are indexed first: one scan of the memory-mapped file finds the
+byte offset of every section header, and runs of sections are parsed in
+parallel worker processes. Scripts that use it must only start their work
+under `if __name__ == "__main__":`, because each worker process imports the
+script that started it.
+"""
+import csv
+import io
+import os
+import re
+
+import pandas as pd
+
+NAME_COLUMN = 6
+ID_COLUMN = 0
+
+# Output columns and where each header's value goes.
+COUNT_COLUMNS = ["daysEnrolled", "daysNotEnrolled", "daysPresent", "daysExcused", "daysNotExcused"]
+COLUMNS = ["id", "name"] + COUNT_COLUMNS
+
+# Files at least this large are parsed section by section across
+# PARSE_WORKERS processes. Smaller ones are parsed in this process, where
+# starting the workers would cost more than it saves.
+PARALLEL_PARSE_BYTES = 16 * 1024 * 1024
+PARSE_WORKERS = min(8, os.cpu_count() or 1)
+
+# Every header row contains "Name"; candidate lines are checked with the CSV parser.
+_NAME = re.compile(rb"[Nn][Aa][Mm][Ee]")
+
+
+def _cell(row, index):
+    return row[index].strip() if index is not None and index < len(row) else ""
+
+
+def isHeaderRow(row):
+    return _cell(row, NAME_COLUMN).lower().startswith("name")
+
+
+def headerColumns(row):
+    """
+    Maps each count column to its index in a section's header row. The first
+    and second columns whose header contains "Enrolled" are the enrolled and
+    not enrolled days; likewise for "Excused".
+    """
+    lowered = [cell.strip().lower() for cell in row]
+    enrolled = [i for i, value in enumerate(lowered) if "enrolled" in value]
+    excused = [i for i, value in enumerate(lowered) if "excused" in value]
+    present = [i for i, value in enumerate(lowered) if "present" in value]
+
+    def nth(indexes, n):
+        return indexes[n] if len(indexes) > n else None
+
+    return {
+        "daysEnrolled": nth(enrolled, 0),
+        "daysNotEnrolled": nth(enrolled, 1),
+        "daysPresent": nth(present, 0),
+        "daysExcused": nth(excused, 0),
+        "daysNotExcused": nth(excused, 1),
+    }
+
+
+def parseRows(rows):
+    """
+    Runs the section state machine over an iterable of CSV rows and returns
+    the student rows as a dict of column lists. Rows before the first header,
+    and rows with no id and no name, are skipped.
+    """
+    data = {column: [] for column in COLUMNS}
+    columns = None
+
+    for row in rows:
+        if isHeaderRow(row):
+            columns = headerColumns(row)
+            continue
+        if columns is None:
+            continue
+
+        id_value = _cell(row, ID_COLUMN)
+        name = _cell(row, NAME_COLUMN)
+        if not id_value and not name:
+            continue
+
+        data["id"].append(id_value)
+        data["name"].append(name)
+        for column in COUNT_COLUMNS:
+            data[column].append(_cell(row, columns[column]))
+
+    return data
+
+
+def toFrame(data):
+    """
+    Builds the typed DataFrame from parsed column lists: id and name as text,
+    day counts as floats (blank or non-numeric cells become NaN).
+    """
+    df = pd.DataFrame(data, columns=COLUMNS)
+    for column in COUNT_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors="coerce").astype(float)
+    return df
+
+
+def sectionOffsets(csv_path):
+    """
+    Returns the byte offset of every section header row, found in one scan
+    of the memory-mapped file.
+    """
+    import mmap
+
+    offsets = []
+    with open(csv_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return offsets
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for match in _NAME.finditer(mapped):
+                start = mapped.rfind(b"\n", 0, match.start()) + 1
+                if offsets and offsets[-1] == start:
+                    continue
+                end = mapped.find(b"\n", start)
+                line = mapped[start:end if end != -1 else len(mapped)].decode("utf-8-sig")
+                if isHeaderRow(next(csv.reader([line]), [])):
+                    offsets.append(start)
+    return offsets
+
+
+def _parseRange(csv_path, start, end):
+    """
+    Parses the sections between two byte offsets of the file; run in the
+    worker processes.
+    """
+    with open(csv_path, "rb") as file:
+        file.seek(start)
+        text = file.read(end - start).decode("utf-8-sig")
+    return toFrame(parseRows(csv.reader(io.StringIO(text, newline=""))))
+
+
+def parseAttendanceReport(csv_path, workers=None):
+    """
+    Parses one attendance report file into a DataFrame with COLUMNS.
+    Files of PARALLEL_PARSE_BYTES or more are split at section boundaries and
+    parsed across workers processes (PARSE_WORKERS by default).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or PARSE_WORKERS
+    size = os.path.getsize(csv_path)
+    offsets = sectionOffsets(csv_path) if workers > 1 and size >= PARALLEL_PARSE_BYTES else []
+
+    if len(offsets) < 2:
+        with open(csv_path, newline="", encoding="utf-8-sig") as file:
+            return toFrame(parseRows(csv.reader(file)))
+
+    # Group neighbouring sections into a few ranges per worker of about the
+    # same size, so each worker gets several and none waits on one large range.
+    target = size / (workers * 4)
+    starts = [offsets[0]]
+    for offset in offsets[1:]:
+        if offset - starts[-1] >= target:
+            starts.append(offset)
+    ends = starts[1:] + [size]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(starts))) as pool:
+        frames = list(pool.map(_parseRange, [csv_path] * len(starts), starts, ends))
+    return pd.concat(frames, ignore_index=True)
+
@@ -0,0 +1,694 @@
+"""
+Benchmarks for the dataUploaders scripts.
+
+Run from the dataUploaders folder:
+    python3 scripts/_benchmarks.py            (runs every benchmark)
+    python3 scripts/_benchmarks.py startup    (runs one benchmark)
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from colorama import init, Fore
+init(autoreset=True)
+
+scripts_folder = os.path.dirname(os.path.abspath(__file__))
+project_folder = os.path.dirname(scripts_folder)
+
+
+def timeToFirstLine(script_path, runs=3):
+    """
+    Starts a script and returns how long each run took to print its first line.
+    """
+    # Unbuffered output so the first print reaches us as soon as it happens,
+    # and a dry run so nothing is uploaded or archived if a file is waiting.
+    env = dict(os.environ, PYTHONUNBUFFERED="1", DATAUPLOADERS_DRY_RUN="1")
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, script_path],
+            cwd=project_folder,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        first_line = process.stdout.readline()
+        elapsed = time.perf_counter() - start
+        process.kill()
+        process.wait()
+
+        # A script that exits without printing (e.g. a missing .env) is timed to exit.
+        timings.append(elapsed if first_line else None)
+    return timings
+
+
+def benchmarkStartup():
+    """
+    Measures import-to-first-line time for each script in scripts/.
+    """
+    print(Fore.YELLOW + "Startup time (interpreter start to first printed line)")
+
+    scripts = sorted(
+        f for f in os.listdir(scripts_folder) if f.endswith(".py") and not f.startswith("_")
+    )
+    for script in scripts:
+        timings = timeToFirstLine(os.path.join(scripts_folder, script))
+        if None in timings:
+            print(f"  {script:<36} no output")
+            continue
+        print(f"  {script:<36} median {statistics.median(timings) * 1000:7.1f} ms  min {min(timings) * 1000:7.1f} ms")
+
+
+def makeATReportCSV(path, rows, seed=0):
+    """
+    Writes a synthetic Aspen attendance report export with the given number of rows.
+    """
+    rng = np.random.default_rng(seed)
+    ids = rng.integers(100000, 100600, rows)
+    df = pd.DataFrame({
+        "Student > Name": np.char.add("Student, ", ids.astype(str)),
+        "Student > Student ID": ids,
+        "Date": pd.Timestamp("2025-09-02") + pd.to_timedelta(rng.integers(0, 180, rows), unit="D"),
+        "Code": rng.choice(["A", "T", "AE", "TE", "D"], rows),
+        "Master > Class": rng.choice(["ENG101", "MTH201", "SCI301", "HIS110", "CS150"], rows),
+        "Master > Description": rng.choice(["English 1", "Algebra 2", "Physics", "US History", "Programming"], rows),
+        "Period": rng.choice(["1", "2", "3", "4", "5", "6", "7", "8"], rows),
+        "Tardy?": rng.choice(["Y", "N"], rows),
+        "Absent?": rng.choice(["Y", "N"], rows),
+        "Student > YOG": rng.choice([2026, 2027, 2028, 2029], rows),
+    })
+    df["Date"] = df["Date"].dt.strftime("%m/%d/%Y")
+    # Exports end with a few blank lines, which readCSV removes.
+    df = pd.concat([df, pd.DataFrame(index=range(3), columns=df.columns)])
+    df.to_csv(path, index=False)
+
+
+def makeFOCUSCSV(path, rows, seed=0):
+    """
+    Writes a synthetic FOCUS swipe export (after its title lines are removed)
+    with the given number of rows.
+    """
+    rng = np.random.default_rng(seed)
+    ids = rng.integers(100000, 100600, rows)
+    swipes = pd.Timestamp("2025-09-02 07:30") + pd.to_timedelta(rng.integers(0, 180 * 86400, rows), unit="s")
+    df = pd.DataFrame({
+        "Swipe_Time": swipes.strftime("%Y-%m-%d %H:%M:%S"),
+        "Student_ID": ids,
+        "Division": "High School",
+        "Student_Name": np.char.add("Student, ", ids.astype(str)),
+        "Status": rng.choice(["Tardy", "Excused", "Late Bus"], rows),
+        "Period_Cause": rng.choice(["1", "2", "3", "4"], rows),
+        "Row_Number": np.arange(1, rows + 1),
+        "Textbox6": rng.integers(0, 20, rows),
+    })
+    df.to_csv(path, index=False)
+
+
+def makeAttendanceReportCSV(path, sections, students=25, seed=0):
+    """
+    Writes a synthetic SIS average daily attendance report: a few title rows,
+    then one "Name" section per homeroom with its students' day counts.
+    """
+    import csv
+
+    rng = np.random.default_rng(seed)
+    width = 22
+    columns = {"Enrolled": 8, "Not Enrolled": 11, "Present": 14, "Excused": 17, "Not Excused": 19}
+
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerows([["Chicago Tech Academy"] + [""] * (width - 1), ["Average Daily Attendance"] + [""] * (width - 1), [""] * width])
+        for section in range(sections):
+            header = [""] * width
+            header[0], header[6] = f"Homeroom {section}", "Name"
+            for title, index in columns.items():
+                header[index] = title
+            writer.writerow(header)
+
+            enrolled = rng.integers(3, 6, students)
+            present = rng.integers(0, enrolled + 1)
+            excused = rng.integers(0, enrolled - present + 1)
+            for student in range(students):
+                row = [""] * width
+                row[0], row[6] = str(10000000 + section * students + student), f"Student, {section}-{student}"
+                row[8], row[11], row[14] = str(enrolled[student]), str(5 - enrolled[student]), str(present[student])
+                row[17], row[19] = str(excused[student]), str(enrolled[student] - present[student] - excused[student])
+                writer.writerow(row)
+            writer.writerow([""] * width)
+
+
+def makeAssignmentCSV(path, rows, seed=0):
+    """
+    Writes a synthetic Aspen assignment breakdown export (after its title line
+    is removed): merged cells leave each row's twelve values spread over 16
+    columns with empty cells between them, and each class ends in a Totals row.
+    """
+    rng = np.random.default_rng(seed)
+    width = 16
+    counts = rng.integers(0, 30, (rows, 8)).astype(str)
+    values = np.column_stack([
+        np.char.add("Teacher ", rng.integers(1, 60, rows).astype(str)),
+        rng.choice(["ENG101", "MTH201", "SCI301", "HIS110", "CS150"], rows),
+        rng.choice(["01", "02", "03", "04", "05", "06", "07", "08", "Lu", "Ad"], rows),
+        np.char.add("Assignment ", np.arange(rows).astype(str)),
+        counts,
+    ])
+    values[::25, 0] = "Totals"
+
+    # Keep the values in order but scatter them across the row's columns.
+    positions = np.sort(np.argsort(rng.random((rows, width)), axis=1)[:, :values.shape[1]], axis=1)
+    cells = np.full((rows, width), "", dtype=object)
+    np.put_along_axis(cells, positions, values, axis=1)
+    pd.DataFrame(cells, columns=[f"Column{i}" for i in range(width)]).to_csv(path, index=False)
+
+
+def makeGradesCSV(path, students=1_500, courses=8, seed=0):
+    """
+    Writes a synthetic full-school Aspen gradebook export: one row per student
+    and course, with the first few sections' grades one column to the right.
+    Teacher names are quoted because they contain commas.
+    """
+    rng = np.random.default_rng(seed)
+    rows = students * courses
+    ids = np.repeat(rng.integers(100000, 999999, students), courses)
+    percents = rng.uniform(40, 100, rows).round(1)
+    letters = np.select([percents >= 90, percents >= 80, percents >= 70, percents >= 60], ["A", "B", "C", "D"], "F")
+
+    df = pd.DataFrame({
+        "yog": np.repeat(rng.choice([2026, 2027, 2028, 2029], students), courses),
+        "name": np.char.add("Student ", ids.astype(str)),
+        "drop1": "", "drop2": "",
+        "id": ids,
+        "course": rng.choice(["ENG101", "MTH201", "SCI301", "HIS110", "CS150"], rows),
+        "drop3": "",
+        "teacher": rng.choice(["Smith, Jane", "Lopez, Ana", "Okafor, Chidi", "Nguyen, Bao"], rows),
+        "drop4": "",
+        "averageAndLetter": "",
+        "move": np.char.add(np.char.add(percents.astype(str), " "), letters),
+    })
+    df.loc[: rows // 10, "averageAndLetter"] = "Q"
+    df.to_csv(path, index=False, header=False)
+
+
+def _legacyGradesLines(lines):
+    # grades_update's old line-by-line realignment, minus its header line.
+    data = list(lines)
+    for i in range(len(data)):
+        row = data[i].strip().split(",")
+        if len(row) > 9 and row[9].strip() != "":
+            for j in range(i, len(data)):
+                next_row = data[j].strip().split(",")
+                if len(next_row) > 9 and next_row[9].strip() == "":
+                    break
+                next_row[8] = next_row[9]
+                next_row[9] = ""
+                data[j] = ",".join(next_row) + "\n"
+            break
+    return data
+
+
+def makeStatementCSV(path, statements, seed=0):
+    """
+    Writes a synthetic SIS billing statement export: one printed page per
+    student with the id, the "To the parent/guardian of:" name block, the
+    balance line and a few fee lines.
+    """
+    import csv
+
+    rng = np.random.default_rng(seed)
+    ids = rng.integers(100000, 999999, statements)
+    balances = rng.integers(0, 250_000, statements) / 100
+    blank = [""] * 5
+
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["", "Billing Statements", "", "", ""])
+        for student, balance in zip(ids, balances):
+            writer.writerows([
+                ["", "Chicago Tech Academy", "", "", ""],
+                ["", "Statement Date: 09/01/2025", "", str(student), ""],
+                ["", "To the parent/guardian of:", "", "", ""],
+                ["", "", f"Student, {student}", "", ""],
+                ["", "2417 S Michigan Ave", "", "", ""],
+                blank,
+                ["", f"This is a current statement of your account.  The total amount due is  $ {balance:,.2f}", "", "", ""],
+                ["", "Lunch", "", "", "12.50"],
+                ["", "Technology fee", "", "", "40.00"],
+                blank,
+            ])
+
+
+def makeSchedulesCSV(path, students=1_500, classes=8, seed=0):
+    """
+    Writes a synthetic Aspen student schedule export: one row per student per class.
+    """
+    rng = np.random.default_rng(seed)
+    rows = students * classes
+    courses = np.array([f"{subject}{level}0{semester}{kind}"
+                        for subject in ("ENG", "MTH", "SCI", "HIS", "CSC", "ART")
+                        for level in "1234" for semester in "12" for kind in "AN"])
+    course = rng.choice(courses, rows)
+    pd.DataFrame({
+        "Student ID": np.repeat(rng.integers(10_000_000, 10_600_000, students), classes),
+        "Class": course,
+        "Description": np.char.add("Course ", course.astype("<U3")),
+        "Name": np.char.add("Teacher ", rng.integers(1, 60, rows).astype(str)),
+        "Schedule": rng.choice(["01(Reg)", "02(Reg)", "03(Reg)", "04(Reg)", "05(Reg)", "06(Reg)", "07(Reg)", "08(Reg)"], rows),
+    }).to_csv(path, index=False)
+
+
+def _legacyStatementBalances(df):
+    # accountBalanceCleaner's old clean_data, minus the entry ID.
+    df = df.iloc[:, [1, 3]].copy()
+    df.columns = ['TEXT', 'ID']
+    df = df.dropna(how='all')
+    df = df.reset_index(drop=True)
+    for i in range(len(df) - 1):
+        if pd.notna(df.at[i, 'ID']) and pd.isna(df.at[i + 1, 'ID']):
+            df.at[i + 1, 'ID'] = df.at[i, 'ID']
+    df = df[df['TEXT'].apply(lambda x: isinstance(x, str))]
+    df = df[df['TEXT'].str.startswith("This is a", na=False)]
+    df['BALANCE'] = df['TEXT'].str.extract(r'\$ ([\d,]+\.\d{2})')[0].str.replace(",", "").astype(float)
+    return df.drop(columns=['TEXT'])
+
+
+def timeCall(action, runs=3):
+    """
+    Runs an action several times and returns the median time in seconds.
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        action()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def benchmarkCSV(rows=1_000_000):
+    """
+    Compares readCSV's pandas and pyarrow engines on large synthetic exports.
+    """
+    from _dataManager import readCSV
+
+    print(Fore.YELLOW + f"readCSV engines ({rows:,} rows)")
+
+    for name, make in (("at-report", makeATReportCSV), ("FOCUS", makeFOCUSCSV)):
+        with tempfile.TemporaryDirectory() as folder:
+            make(os.path.join(folder, f"{name}.csv"), rows)
+
+            timings = {}
+            for engine in ("c", "pyarrow"):
+                # readCSV reports each file it opens, which is noise here.
+                with open(os.devnull, "w") as devnull:
+                    stdout, sys.stdout = sys.stdout, devnull
+                    try:
+                        timings[engine] = timeCall(lambda: readCSV(folder, engine=engine))
+                    finally:
+                        sys.stdout = stdout
+
+            print(
+                f"  {name:<12} c {timings['c'] * 1000:8.1f} ms  pyarrow {timings['pyarrow'] * 1000:8.1f} ms"
+                f"  ({timings['c'] / timings['pyarrow']:.1f}x)"
+            )
+
+
+def _legacyStandardDate(date_str):
+    # The per-row convertToStandardDate that at_report_update used to .apply.
+    if pd.isnull(date_str):
+        return None
+    month, day, year = map(int, date_str.split("/"))
+    if year < 100:
+        year += 1900 if year >= 50 else 2000
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def _legacySchoolYear(date):
+    year = int(date.split("-")[0]) % 100
+    return f"SY{year + 1}" if int(date.split("-")[1]) > 7 else f"SY{year}"
+
+
+def _legacySemester(date):
+    return "S1" if int(date.split("-")[1]) > 7 else "S2"
+
+
+def benchmarkDates(rows=250_000):
+    """
+    Compares the old per-row date helpers with the vectorized ones on about a
+    year of at-report rows, and FOCUS's inferred swipe-time parse with the
+    explicit-format one.
+    """
+    import _dateParsing
+
+    print(Fore.YELLOW + f"Date parsing ({rows:,} rows)")
+
+    with tempfile.TemporaryDirectory() as folder:
+        makeATReportCSV(os.path.join(folder, "at.csv"), rows)
+        makeFOCUSCSV(os.path.join(folder, "focus.csv"), rows)
+        at_dates = pd.read_csv(os.path.join(folder, "at.csv"), usecols=["Date"], dtype=str)["Date"].dropna()
+        swipes = pd.read_csv(os.path.join(folder, "focus.csv"), usecols=["Swipe_Time"], dtype=str)["Swipe_Time"]
+
+    def perRow():
+        dates = at_dates.apply(_legacyStandardDate)
+        return dates.apply(_legacySchoolYear), dates.apply(_legacySemester)
+
+    def vectorized():
+        dates = _dateParsing.toStandardDate(at_dates)
+        return _dateParsing.schoolYear(dates), _dateParsing.semester(dates)
+
+    assert perRow()[0].equals(vectorized()[0])
+
+    for name, before, after in (
+        ("at-report date, sy, semester", perRow, vectorized),
+        ("FOCUS swipe times", lambda: pd.to_datetime(swipes.str.strip(), errors="coerce"),
+         lambda: _dateParsing.parseDateTimes(swipes)),
+    ):
+        old, new = timeCall(before), timeCall(after)
+        print(f"  {name:<30} before {old * 1000:8.1f} ms  after {new * 1000:8.1f} ms  ({old / new:.1f}x)")
+
+
+def benchmarkAttendance(sections=12_000):
+    """
+    Compares parsing a large attendance report in one process with the
+    section-indexed parallel parse.
+    """
+    import _attendanceReport
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "totals.csv")
+        makeAttendanceReportCSV(path, sections)
+        size = os.path.getsize(path)
+        print(Fore.YELLOW + f"Attendance report parsing ({sections:,} sections, {size / 1e6:.0f} MB)")
+
+        serial = _attendanceReport.parseAttendanceReport(path, workers=1)
+        parallel = _attendanceReport.parseAttendanceReport(path)
+        assert serial.equals(parallel)
+
+        single = timeCall(lambda: _attendanceReport.parseAttendanceReport(path, workers=1))
+        index = timeCall(lambda: _attendanceReport.sectionOffsets(path))
+        many = timeCall(lambda: _attendanceReport.parseAttendanceReport(path))
+        print(f"  {'one process':<30} {single * 1000:8.1f} ms")
+        print(f"  {'section index only':<30} {index * 1000:8.1f} ms")
+        print(
+            f"  {f'{_attendanceReport.PARSE_WORKERS} worker processes':<30} {many * 1000:8.1f} ms  ({single / many:.1f}x)"
+        )
+
+
+def benchmarkCompact(rows=100_000):
+    """
+    Compares assignment_upload's old row-by-row left-compaction with
+    leftCompact on a large synthetic assignment breakdown export.
+    """
+    from _dataManager import leftCompact
+
+    print(Fore.YELLOW + f"Left-compacting merged cells ({rows:,} rows)")
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "assignments.csv")
+        makeAssignmentCSV(path, rows)
+        df = pd.read_csv(path)
+
+    def perRow():
+        return df.apply(lambda x: pd.Series(x.dropna().values), axis=1)
+
+    pd.testing.assert_frame_equal(perRow(), leftCompact(df))
+
+    # The row-by-row version takes many seconds, so it is timed once.
+    old, new = timeCall(perRow, runs=1), timeCall(lambda: leftCompact(df))
+    print(f"  {'assignment export':<30} before {old * 1000:8.1f} ms  after {new * 1000:8.1f} ms  ({old / new:.1f}x)")
+
+
+def benchmarkGrades(students=1_500, courses=8):
+    """
+    Compares grades_update's old line-by-line realignment with the parsed,
+    vectorized one on a full-school gradebook export.
+    """
+    import io
+
+    os.environ.setdefault("DATAUPLOADERS_DRY_RUN", "1")
+    from grades_update import COLUMN_NAMES, prepareCSVFile
+
+    rows = students * courses
+    print(Fore.YELLOW + f"Grades realignment ({rows:,} rows)")
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "grades.csv")
+        makeGradesCSV(path, students, courses)
+        # The old realignment splits quoted teacher names, so compare it on a
+        # copy without the comma.
+        plain = os.path.join(folder, "plain.csv")
+        with open(path) as source, open(plain, "w") as target:
+            target.write(source.read().replace('"', "").replace(", ", " "))
+
+        def lineByLine(csv_path):
+            with open(csv_path) as file:
+                df = pd.read_csv(io.StringIO("".join(_legacyGradesLines(file.readlines()))), header=None, names=COLUMN_NAMES)
+            df["averageAndLetter"] = df["averageAndLetter"].fillna(df["move"])
+            return df
+
+        before = lineByLine(plain)
+        after = prepareCSVFile(plain)
+        assert before["averageAndLetter"].equals(after["averageAndLetter"])
+        assert prepareCSVFile(path)["teacher"].str.contains(",").all()
+
+        old, new = timeCall(lambda: lineByLine(plain)), timeCall(lambda: prepareCSVFile(path))
+        print(
+            f"  {'gradebook export':<30} before {old * 1000:8.1f} ms  after {new * 1000:8.1f} ms  ({old / new:.1f}x,"
+            f" {rows / new:,.0f} rows/s)"
+        )
+
+
+def benchmarkStatements(statements=20_000):
+    """
+    Compares accountBalanceCleaner's old row-by-row id fill with the
+    vectorized statement parser on a district-wide billing export.
+    """
+    import _accountStatements
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "statements.csv")
+        makeStatementCSV(path, statements)
+        print(Fore.YELLOW + f"Statement parsing ({statements:,} statements, {os.path.getsize(path) / 1e6:.0f} MB)")
+
+        def rowByRow():
+            return _legacyStatementBalances(pd.read_csv(path).dropna(how="all"))
+
+        before = rowByRow()
+        after = _accountStatements.parseStatements(path)
+        assert (before["ID"].astype(int).to_numpy() == after["id"].to_numpy()).all()
+        assert (before["BALANCE"].to_numpy() == after["balance"].to_numpy()).all()
+        assert after["name"].notna().all()
+
+        # The row-by-row version takes many seconds, so it is timed once.
+        old, new = timeCall(rowByRow, runs=1), timeCall(lambda: _accountStatements.parseStatements(path))
+        print(f"  {'billing export':<30} before {old * 1000:8.1f} ms  after {new * 1000:8.1f} ms  ({old / new:.1f}x)")
+
+
+def benchmarkNumbers(rows=200_000):
+    """
+    Compares the scripts' old ad hoc numeric cleanup with parseNumbers and
+    parseNumberAndLetter, one format at a time.
+    """
+    import _numberParsing
+
+    print(Fore.YELLOW + f"Number parsing ({rows:,} values per format)")
+
+    rng = np.random.default_rng(0)
+    amounts = rng.integers(-250_000, 250_000, rows) / 100
+    percents = rng.integers(0, 1000, rows) / 10
+    letters = rng.choice(["A", "B", "C", "D", "F"], rows)
+
+    balances = pd.Series([f"({-x:.2f})" if x < 0 else f"{x:.2f}" for x in amounts])
+    currency = pd.Series([f"$ {abs(x):,.2f}" for x in amounts])
+    percent = pd.Series([f"{x}%" for x in percents])
+    grades = pd.Series([f"{x} {letter}" for x, letter in zip(percents, letters)])
+
+    cases = (
+        ("(12.50) negatives", balances,
+         lambda: balances.apply(lambda x: x.replace("(", "-").replace(")", "") if "(" in x else x).astype(float),
+         lambda: _numberParsing.parseNumbers(balances)[0]),
+        ("$ 1,234.56 currency", currency,
+         lambda: currency.str.extract(r"\$ ([\d,]+\.\d{2})")[0].str.replace(",", "").astype(float),
+         lambda: _numberParsing.parseNumbers(currency)[0]),
+        ("12.5% percents", percent,
+         lambda: percent.str.rstrip("%").astype(float),
+         lambda: _numberParsing.parseNumbers(percent)[0]),
+        ("93.5 A grades", grades,
+         lambda: grades.str.split(expand=True)[0].astype(float),
+         lambda: _numberParsing.parseNumberAndLetter(grades)[0]),
+    )
+    for name, values, before, after in cases:
+        assert np.allclose(before().to_numpy(), after().to_numpy())
+        old, new = timeCall(before), timeCall(after)
+        print(f"  {name:<30} before {old * 1000:8.1f} ms  after {new * 1000:8.1f} ms  ({old / new:.1f}x)")
+
+
+def peakMemory(action):
+    """
+    Runs an action once and returns the most memory it had allocated at once, in bytes.
+    """
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        action()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmarkProjection(rows=1_000_000):
+    """
+    Compares the scripts' old rename, drop, add, astype and reorder steps with
+    compileProjection on a large at-report export and assignment export.
+    """
+    from _dataManager import compileProjection, leftCompact, readCSV, readScriptSettings
+
+    print(Fore.YELLOW + f"Shaping cleaned frames for upload ({rows:,} rows)")
+
+    at_report = readScriptSettings(os.path.join(scripts_folder, "at_report_update.py"))
+    assignment = readScriptSettings(os.path.join(scripts_folder, "assignment_upload.py"))
+
+    with tempfile.TemporaryDirectory() as folder:
+        makeATReportCSV(os.path.join(folder, "at-report.csv"), rows)
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                _, report = readCSV(folder, engine="pyarrow", column_mappings=at_report["column_mappings"], tableSchema=at_report["tableSchema"])
+            finally:
+                sys.stdout = stdout
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "assignments.csv")
+        makeAssignmentCSV(path, rows // 10)
+        export = leftCompact(pd.read_csv(path))
+        export = export[~export[0].str.contains("Totals", case=False, na=False)]
+
+    # Dates and calendar columns are worked out the same way either way.
+    date, sy, semester = report["Date"], "SY26", "S1"
+
+    def atReportSteps(df):
+        df["entryID"] = 20250901
+        df.rename(columns=at_report["column_mappings"], inplace=True)
+        df.drop(columns=["yog", "tardy", "absent"], inplace=True)
+        df["date"] = date
+        df["sy"] = sy
+        df["semester"] = semester
+        return df
+
+    def assignmentSteps(df):
+        df.rename(columns=assignment["COLUMN_MAPPINGS"], inplace=True)
+        df["entryID"] = 20250901
+        df["term"] = "-"
+        for field in assignment["schema"]:
+            df[field["name"]] = df[field["name"]].astype({"INTEGER": int, "STRING": str}[field["type"]])
+        return df
+
+    # Plain column types, as the old steps made; the encoding benchmark covers compact ones.
+    projectReport = compileProjection(at_report["tableSchema"], at_report["column_mappings"], compact=False)
+    projectAssignment = compileProjection(assignment["schema"], assignment["COLUMN_MAPPINGS"], compact=False)
+
+    # The old steps change the frame they are given, so both sides start from a copy.
+    cases = (
+        ("at-report", lambda: atReportSteps(report.copy()),
+         lambda: projectReport(report.copy(), entryID=20250901, date=date, sy=sy, semester=semester)),
+        ("assignment export", lambda: assignmentSteps(export.copy()),
+         lambda: projectAssignment(export.copy(), entryID=20250901, term="-")),
+    )
+    for name, before, after in cases:
+        pd.testing.assert_frame_equal(after(), before()[list(after().columns)], check_dtype=False)
+        old, new = timeCall(before), timeCall(after)
+        old_peak, new_peak = peakMemory(before), peakMemory(after)
+        print(
+            f"  {name:<30} before {old * 1000:8.1f} ms {old_peak / 2**20:7.1f} MB"
+            f"  after {new * 1000:8.1f} ms {new_peak / 2**20:7.1f} MB  ({old / new:.1f}x)"
+        )
+
+
+def benchmarkEncoding(rows=1_000_000, students=20_000):
+    """
+    Compares the memory, Parquet upload size and time to build the upload of
+    cleaned at-report and schedules frames with plain object, int64 and
+    float64 columns against compileProjection's categorical, int32 and
+    float32 ones.
+    """
+    import io
+    import pyarrow.parquet as pq
+    from _dataManager import calendarColumns, compileProjection, convertToStandardDate, readCSV, readScriptSettings, toArrowTable
+
+    print(Fore.YELLOW + f"Compact column types (at-report {rows:,} rows, schedules {students:,} students)")
+
+    at_report = readScriptSettings(os.path.join(scripts_folder, "at_report_update.py"))
+    schedules = readScriptSettings(os.path.join(scripts_folder, "schedules_update.py"))
+
+    def read(make, settings, *args):
+        with tempfile.TemporaryDirectory() as folder:
+            make(os.path.join(folder, "export.csv"), *args)
+            with open(os.devnull, "w") as devnull:
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    return readCSV(folder, column_mappings=settings["column_mappings"], tableSchema=settings["tableSchema"])[1]
+                finally:
+                    sys.stdout = stdout
+
+    report = read(makeATReportCSV, at_report, rows)
+    date = convertToStandardDate(report["Date"])
+    calendar = calendarColumns(date, ["sy", "semester"])
+    report_values = {"entryID": 20250901, "date": date, "sy": calendar["sy"], "semester": calendar["semester"]}
+
+    schedule = read(makeSchedulesCSV, schedules, students)
+    schedule_values = {"entryID": 20250901, "sy": "SY26", "semester": schedule["Class"].str[5].map({"1": "S1", "2": "S2"})}
+
+    def uploadBytes(df, schema):
+        buffer = io.BytesIO()
+        pq.write_table(toArrowTable(df, schema), buffer, compression="zstd")
+        return buffer.tell()
+
+    for name, settings, raw, values in (
+        ("at-report", at_report, report, report_values),
+        ("schedules", schedules, schedule, schedule_values),
+    ):
+        schema = settings["tableSchema"]
+        plain = compileProjection(schema, settings["column_mappings"], compact=False)(raw, **values)
+        compact = compileProjection(schema, settings["column_mappings"])(raw, **values)
+        pd.testing.assert_frame_equal(compact, plain, check_dtype=False, check_categorical=False)
+
+        memory = [df.memory_usage(index=False, deep=True).sum() / 2**20 for df in (plain, compact)]
+        upload = [uploadBytes(df, schema) / 2**20 for df in (plain, compact)]
+        seconds = [timeCall(lambda: uploadBytes(df, schema)) for df in (plain, compact)]
+        print(
+            f"  {name:<12} memory {memory[0]:7.1f} MB -> {memory[1]:6.1f} MB ({memory[0] / memory[1]:.1f}x)"
+            f"  Parquet {upload[0]:5.2f} MB -> {upload[1]:5.2f} MB"
+            f"  built in {seconds[0] * 1000:6.1f} ms -> {seconds[1] * 1000:6.1f} ms ({seconds[0] / seconds[1]:.1f}x)"
+        )
+
+
+BENCHMARKS = {
+    "startup": benchmarkStartup,
+    "csv": benchmarkCSV,
+    "dates": benchmarkDates,
+    "attendance": benchmarkAttendance,
+    "compact": benchmarkCompact,
+    "grades": benchmarkGrades,
+    "statements": benchmarkStatements,
+    "numbers": benchmarkNumbers,
+    "projection": benchmarkProjection,
+    "encoding": benchmarkEncoding,
+}
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(Fore.RED + f"Unknown benchmark '{name}'. Choose from: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        BENCHMARKS[name]()
@@ -1,72 +1,959 @@
 from datetime import datetime
+import numpy as np
 import pandas as pd
-import pandas_gbq
-import pydata_google_auth
+import json
+import itertools
 import os
+import random
+import sys
+import time
 from colorama import init, Fore
+import _dateParsing
+from _dateParsing import parseDates, parseDateTimes
+from _numberParsing import parseNumbers, parseNumberAndLetter
+from _schoolCalendar import calendarColumns, currentSchoolYear, currentWeek, gradeToYOG, yogToGrade
 init(autoreset=True)
 
+# pandas_gbq, pydata_google_auth, google.cloud.bigquery and pyarrow roughly
+# double an uploader's import time. They are imported inside the functions
+# that talk to BigQuery so a run that has nothing to upload (or a dry run)
+# never loads them.
+
 SCOPES = [
     "https://www.googleapis.com/auth/cloud-platform",
     "https://www.googleapis.com/auth/drive",
 ]
 
-credentials = pydata_google_auth.get_user_credentials(
-    SCOPES,
-    # Note, this doesn't work if you're running from a notebook on a
-    # remote sever, such as over SSH or with Google Colab. In those cases,
-    # install the gcloud command line interface and authenticate with the
-    # `gcloud auth application-default login` command and the `--no-browser`
-    # option.
-    auth_local_webserver=True,
-)
+# Where the OAuth token is cached (~/.config/dataUploaders/). Every uploader
+# reads the same file, so a batch run only logs in once. The cached refresh
+# token is used to renew the access token when it expires.
+CREDENTIALS_CACHE_DIR = "dataUploaders"
+CREDENTIALS_CACHE_FILE = "bigquery_credentials.json"
+
+# Set DATAUPLOADERS_AUTH=service (or point GOOGLE_APPLICATION_CREDENTIALS at a
+# service account key) to use a service account or `gcloud auth
+# application-default login` instead of the browser login.
+AUTH_MODE = os.environ.get("DATAUPLOADERS_AUTH", "user")
+
+# Set DATAUPLOADERS_DRY_RUN=1 or pass --dry-run to clean the data without
+# touching BigQuery or archiving the source files.
+DRY_RUN = os.environ.get("DATAUPLOADERS_DRY_RUN") == "1" or "--dry-run" in sys.argv
+
+# Frames with at least this many rows are uploaded with a Parquet load job
+# instead of pandas_gbq unless uploadToBigQuery is given an engine.
+PARQUET_ROW_THRESHOLD = 50000
+
+# Concurrent streams used by the "storage" upload engine, and the target size
+# of each AppendRows request (the Storage Write API caps requests at 10 MB).
+STORAGE_WRITE_STREAMS = 4
+STORAGE_WRITE_REQUEST_BYTES = 8 * 1024 * 1024
+
+# Most parallel streams requested when reading a table with the Storage Read API.
+READ_STREAMS = 4
+
+# Frames with at least this many rows are uploaded in resumable chunks. Each
+# committed chunk is recorded in a checkpoint file, so a rerun after a failure
+# continues where the last run stopped instead of starting over.
+RESUMABLE_ROW_THRESHOLD = 200000
+CHECKPOINT_FOLDER = "../dataUploaders/.uploadCheckpoints"
+
+# The first chunk is sized from the row width, then each chunk is resized so
+# it takes about CHUNK_TARGET_SECONDS to upload.
+CHUNK_START_BYTES = 32 * 1024 * 1024
+CHUNK_MIN_ROWS = 10000
+CHUNK_TARGET_SECONDS = 30
+
+# Failed chunks are retried with exponential backoff (2s, 4s, 8s, ...).
+UPLOAD_RETRIES = 5
+RETRY_BASE_SECONDS = 2
+
+# Concurrent load jobs used when overwriting daily partitions. BigQuery allows
+# 1,500 load jobs per table per day, so very long backfills should be split.
+PARTITION_LOAD_WORKERS = 4
+
+# Column holding each spooled row's position in the merge staging table, so
+# the last of several rows with the same key wins.
+SPOOL_ROW_COLUMN = "_spoolRow"
+
+# Tables are clustered by id and then by the first of these they have, so
+# per-student and per-course queries read less data.
+CLUSTER_SECOND_KEYS = ["course", "classCode", "period", "code", "week"]
+
+# compileProjection stores these low-cardinality text columns as pandas
+# categoricals, which Arrow and Parquet keep as dictionary-encoded strings,
+# and the day counts as float32 (they are whole or half days). Integer
+# columns whose values fit, such as ids, entryIDs and years, become int32.
+CATEGORY_COLUMNS = ["code", "period", "course", "class", "classCode", "teacher", "week", "sy", "semester", "status"]
+FLOAT32_COLUMNS = ["daysEnrolled", "daysNotEnrolled", "daysPresent", "daysExcused", "daysNotExcused"]
+
+# Set DATAUPLOADERS_ARCHIVE_FORMAT=parquet to archive cleaned rows as
+# compressed Parquet, which keeps their column types, instead of CSV.
+ARCHIVE_FORMAT = os.environ.get("DATAUPLOADERS_ARCHIVE_FORMAT", "csv")
 
-def fetchDataFromBigQuery(query):
+# Source files whose parsed frame would pass DATAUPLOADERS_MEMORY_MB (default
+# 1024) are streamed through cleanData in chunks instead of read whole. A
+# parsed frame takes about CSV_MEMORY_FACTOR times the file's size, and each
+# chunk is a quarter of the budget so cleanData's copies still fit.
+MEMORY_BUDGET_BYTES = int(os.environ.get("DATAUPLOADERS_MEMORY_MB", "1024")) * 1024 * 1024
+CSV_MEMORY_FACTOR = 4
+
+# Most source files parsed at once when a folder holds several exports.
+CSV_READ_WORKERS = 4
+
+_credentials = None
+_sessions = {}
+
+
+def getCredentials():
+    """
+    Returns the Google credentials, logging in on first use only.
+    """
+    global _credentials
+
+    if _credentials is None:
+        if AUTH_MODE == "service" or os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
+            import google.auth
+
+            _credentials, _ = google.auth.default(scopes=SCOPES)
+        else:
+            import pydata_google_auth
+
+            _credentials = pydata_google_auth.get_user_credentials(
+                SCOPES,
+                credentials_cache=pydata_google_auth.cache.ReadWriteCredentialsCache(
+                    dirname=CREDENTIALS_CACHE_DIR, filename=CREDENTIALS_CACHE_FILE
+                ),
+                # Note, this doesn't work if you're running from a notebook on a
+                # remote sever, such as over SSH or with Google Colab. In those cases,
+                # install the gcloud command line interface, authenticate with the
+                # `gcloud auth application-default login` command and the `--no-browser`
+                # option, and set DATAUPLOADERS_AUTH=service.
+                auth_local_webserver=True,
+            )
+
+    return _credentials
+
+def fetchDataFromBigQuery(query, project_id="chitechdb", session=None, asArrow=False):
     """
-    Fetches data from BigQuery and returns a DataFrame.
+    Fetches data from BigQuery and returns a DataFrame (or an Arrow table if asArrow).
+    Results are downloaded as Arrow through the BigQuery Storage Read API.
+    For plain table lookups use fetchTableFromBigQuery, which skips the query job.
     """
     print(Fore.BLUE + "Fetching data from BigQuery...")
-    df = pandas_gbq.read_gbq(
-        query,
-        project_id="chitechdb",
-        credentials=credentials,
+    if DRY_RUN:
+        print(Fore.YELLOW + f"Dry run: skipped query: {query}")
+        return pd.DataFrame()
+
+    if session is None:
+        session = getSession(project_id)
+    table = session.client.query(query).to_arrow(bqstorage_client=session.readClient)
+    return table if asArrow else table.to_pandas()
+
+
+def fetchTableFromBigQuery(project_id, dataset_id, table_id, columns=None, rowFilter=None, session=None, asArrow=False):
+    """
+    Reads a table straight into Arrow through the BigQuery Storage Read API,
+    without running a query job. Only the listed columns are read, and
+    rowFilter (a SQL condition such as "id IN (1, 2)") is applied by BigQuery
+    before any rows are sent. Returns a DataFrame, or an Arrow table if asArrow.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import pyarrow as pa
+    from google.cloud.bigquery_storage_v1 import types
+
+    print(Fore.BLUE + f"Fetching {table_id} from BigQuery...")
+    if DRY_RUN:
+        print(Fore.YELLOW + f"Dry run: skipped reading {dataset_id}.{table_id}.")
+        return pd.DataFrame(columns=columns)
+
+    if session is None:
+        session = getSession(project_id)
+    readClient = session.readClient
+
+    read_session = readClient.create_read_session(
+        parent=f"projects/{project_id}",
+        read_session=types.ReadSession(
+            table=f"projects/{project_id}/datasets/{dataset_id}/tables/{table_id}",
+            data_format=types.DataFormat.ARROW,
+            read_options=types.ReadSession.TableReadOptions(
+                selected_fields=columns or [], row_restriction=rowFilter or ""
+            ),
+        ),
+        max_stream_count=READ_STREAMS,
     )
-    return df
 
-def deleteAllDataFromTable(project_id, dataset_id, table_id):
+    def readStream(stream):
+        return readClient.read_rows(stream.name).to_arrow(read_session)
+
+    if read_session.streams:
+        with ThreadPoolExecutor(max_workers=len(read_session.streams)) as pool:
+            table = pa.concat_tables(pool.map(readStream, read_session.streams))
+    else:
+        # No rows matched, so BigQuery sent back a schema and no streams.
+        schema = pa.ipc.read_schema(pa.py_buffer(read_session.arrow_schema.serialized_schema))
+        table = schema.empty_table()
+
+    return table if asArrow else table.to_pandas()
+
+
+def sqlList(values):
+    """
+    Formats values for a SQL IN (...) list, quoting strings.
+    """
+    def literal(value):
+        if isinstance(value, str):
+            return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+        return str(value)
+
+    return "(" + ", ".join(literal(value) for value in values) + ")"
+
+
+def deleteAllDataFromTable(project_id, dataset_id, table_id, session=None, df=None):
     """
-    Deletes all data from the specified BigQuery table.
+    Deletes all data from the specified BigQuery table. Pass the frame about
+    to be uploaded as df so an interrupted upload of it can resume.
     """
     print(Fore.BLUE + "Deleting old data from database to override...")
-    pandas_gbq.context.credentials = credentials
-    pandas_gbq.context.project = project_id
-    query = f"DELETE FROM `{dataset_id}.{table_id}` WHERE TRUE"
-    pandas_gbq.read_gbq(query)
+    if DRY_RUN:
+        print(Fore.YELLOW + f"Dry run: skipped deleting all data from {table_id}.")
+        return
+    if _resumesUpload(dataset_id, table_id, df):
+        print(Fore.YELLOW + f"Resuming an interrupted upload to {table_id}; its old data was already deleted.")
+        return
+
+    if session is None:
+        session = getSession(project_id)
+    session.query(f"DELETE FROM `{project_id}.{dataset_id}.{table_id}` WHERE TRUE")
     print(Fore.BLUE + f"All data from {table_id} has been deleted.")
 
-def deleteDataBetweenDates(project_id, dataset_id, table_id, min_date, max_date):
+def deleteDataBetweenDates(project_id, dataset_id, table_id, min_date, max_date, session=None, df=None):
     """
     Deletes data from the specified BigQuery table within a specified date range.
+    Pass the frame about to be uploaded as df so an interrupted upload of it can resume.
     """
     print(Fore.BLUE + "Deleting data from database within date range...")
-    pandas_gbq.context.credentials = credentials
-    pandas_gbq.context.project = project_id
-    query = f"DELETE FROM `{dataset_id}.{table_id}` WHERE date BETWEEN '{min_date}' AND '{max_date}'"
-    pandas_gbq.read_gbq(query)
+    if DRY_RUN:
+        print(Fore.YELLOW + f"Dry run: skipped deleting {table_id} data between {min_date} and {max_date}.")
+        return
+    if _resumesUpload(dataset_id, table_id, df):
+        print(Fore.YELLOW + f"Resuming an interrupted upload to {table_id}; its old data was already deleted.")
+        return
+
+    if session is None:
+        session = getSession(project_id)
+    session.query(
+        f"DELETE FROM `{project_id}.{dataset_id}.{table_id}` WHERE date BETWEEN '{min_date}' AND '{max_date}'"
+    )
     print(Fore.BLUE + "Data deletion completed.")
 
 
-def uploadToBigQuery(df, schema, project_id, dataset_id, table_id):
+class BigQuerySession:
+    """
+    Holds one BigQuery client for the run and caches table metadata, so
+    processing many tables does not repeat handshakes or metadata calls.
+    A stand-in client can be passed in to run without BigQuery.
+    """
+
+    def __init__(self, project_id, client=None, writeClient=None, readClient=None):
+        self.project_id = project_id
+        self._client = client
+        self._writeClient = writeClient
+        self._readClient = readClient
+        self._tables = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google.cloud import bigquery
+
+            self._client = bigquery.Client(project=self.project_id, credentials=getCredentials())
+        return self._client
+
+    @property
+    def writeClient(self):
+        if self._writeClient is None:
+            from google.cloud import bigquery_storage_v1
+
+            self._writeClient = bigquery_storage_v1.BigQueryWriteClient(credentials=getCredentials())
+        return self._writeClient
+
+    @property
+    def readClient(self):
+        if self._readClient is None:
+            from google.cloud import bigquery_storage_v1
+
+            self._readClient = bigquery_storage_v1.BigQueryReadClient(credentials=getCredentials())
+        return self._readClient
+
+    def getTable(self, table_path):
+        """
+        Returns the table's metadata, fetching it once per run.
+        """
+        if table_path not in self._tables:
+            self._tables[table_path] = self.client.get_table(table_path)
+        return self._tables[table_path]
+
+    def forgetTable(self, table_path):
+        """
+        Drops cached metadata after the table itself has been changed.
+        """
+        self._tables.pop(table_path, None)
+
+    def query(self, query):
+        """
+        Runs a query and waits for it to finish.
+        """
+        job = self.client.query(query)
+        job.result()
+        return job
+
+
+def getSession(project_id):
+    """
+    Returns the shared BigQuerySession for the project.
+    """
+    if project_id not in _sessions:
+        _sessions[project_id] = BigQuerySession(project_id)
+    return _sessions[project_id]
+
+
+def toArrowTable(df, schema):
+    """
+    Converts a DataFrame to an Arrow table, typing each column from the tableSchema list.
+    Columns that are not in the schema keep the type Arrow infers for them.
+    Categorical STRING columns become dictionary-encoded strings and int32 and
+    float32 columns keep their width; BigQuery widens them when it loads them.
+    """
+    import pyarrow as pa
+
+    # BigQuery column names are case-insensitive, so match them that way too.
+    schema_types = {field["name"].lower(): field["type"] for field in schema}
+
+    fields = []
+    arrays = []
+    for column in df.columns:
+        bq_type = schema_types.get(str(column).lower())
+        series = df[column]
+        if bq_type is None:
+            array = pa.array(series, from_pandas=True)
+        else:
+            array = _toArrowArray(series, bq_type)
+        fields.append(pa.field(str(column), array.type))
+        arrays.append(array)
+
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def _arrowType(bq_type):
+    """
+    Returns the Arrow type used for a BigQuery column type.
+    """
+    import pyarrow as pa
+
+    return {
+        "INTEGER": pa.int64(),
+        "FLOAT": pa.float64(),
+        "STRING": pa.string(),
+        "BOOLEAN": pa.bool_(),
+        "DATE": pa.date32(),
+        "TIME": pa.time64("us"),
+        "TIMESTAMP": pa.timestamp("us", tz="UTC"),
+    }[bq_type]
+
+
+def _compactArrowType(series, bq_type):
+    """
+    Returns the narrower Arrow type a compact column (see compileProjection)
+    keeps for its BigQuery type, or None.
+    """
+    import pyarrow as pa
+
+    if bq_type == "STRING" and isinstance(series.dtype, pd.CategoricalDtype):
+        # int32 indices, so chunks with different numbers of categories share one type.
+        return pa.dictionary(pa.int32(), pa.string())
+    if bq_type == "INTEGER" and pd.api.types.is_integer_dtype(series) and series.dtype.itemsize == 4:
+        return pa.int32()
+    if bq_type == "FLOAT" and pd.api.types.is_float_dtype(series) and series.dtype.itemsize == 4:
+        return pa.float32()
+    return None
+
+
+def _toArrowArray(series, bq_type):
+    """
+    Converts one column to the Arrow type that matches its BigQuery type.
+    """
+    import pyarrow as pa
+
+    compact_type = _compactArrowType(series, bq_type)
+    if compact_type is not None:
+        try:
+            array = pa.array(series, type=compact_type, from_pandas=True)
+            if array.type == compact_type:
+                return array
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+            pass
+        # e.g. categories that are not text: decode them and type the values below.
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(object)
+
+    arrow_type = _arrowType(bq_type)
+    try:
+        return pa.array(series, type=arrow_type, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+        pass
+
+    # The column holds text (or mixed values) rather than the target type,
+    # e.g. "2025-09-03" in a DATE column, so parse it first.
+    if bq_type == "DATE":
+        return pa.array(pd.to_datetime(series, errors="coerce")).cast(arrow_type)
+    if bq_type == "TIME":
+        parsed = pd.to_datetime(series.astype("string"), format="%H:%M:%S", errors="coerce")
+        return pa.array(parsed).cast(arrow_type)
+    if bq_type in ("INTEGER", "FLOAT"):
+        return pa.array(pd.to_numeric(series), type=arrow_type, from_pandas=True)
+    if bq_type == "STRING":
+        return pa.array(series.astype("string"), type=arrow_type, from_pandas=True)
+    return pa.array(series, from_pandas=True).cast(arrow_type)
+
+
+def _widenToSchema(table, schema):
+    """
+    Casts the compact columns of an Arrow table from toArrowTable (dictionary
+    strings, int32, float32) back to the plain type of their BigQuery type,
+    for writers that need the exact column types.
+    """
+    import pyarrow as pa
+
+    schema_types = {field["name"].lower(): field["type"] for field in schema}
+    fields = []
+    for field in table.schema:
+        bq_type = schema_types.get(field.name.lower())
+        fields.append(field if bq_type is None else pa.field(field.name, _arrowType(bq_type)))
+    return table.cast(pa.schema(fields))
+
+
+def _decategorize(df):
+    """
+    Returns the frame with its categorical columns as plain object columns,
+    for writers that do not take categoricals.
+    """
+    categorical = [column for column in df.columns if isinstance(df[column].dtype, pd.CategoricalDtype)]
+    if not categorical:
+        return df
+    return df.astype({column: object for column in categorical})
+
+
+def loadParquetToBigQuery(df, schema, project_id, destination, session=None, write_disposition="WRITE_APPEND", job_id=None):
+    """
+    Writes the DataFrame to compressed Parquet in memory and loads it into the
+    destination table ("dataset.table") with a single load job.
+    A session built around any object with a load_table_from_file method can
+    stand in for BigQuery.
+
+    Reusing a job_id makes a retry safe: if the job already ran, it is not run
+    again. If it failed, the retry is submitted as job_id_1, job_id_2 and so on.
+    """
+    import io
+    import pyarrow.parquet as pq
+
+    buffer = io.BytesIO()
+    pq.write_table(toArrowTable(df, schema), buffer, compression="zstd")
+    buffer.seek(0)
+    return loadParquetFileToBigQuery(buffer, project_id, destination, session, write_disposition, job_id)
+
+
+def loadParquetFileToBigQuery(file, project_id, destination, session=None, write_disposition="WRITE_APPEND", job_id=None):
+    """
+    Loads an open Parquet file (or in-memory buffer) into the destination
+    table ("dataset.table") with a single load job.
+    """
+    from google.cloud import bigquery
+
+    if session is None:
+        session = getSession(project_id)
+    client = session.client
+
+    # Parquet carries its own column types, so no schema is sent with the job.
+    job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.PARQUET,
+        write_disposition=write_disposition,
+    )
+
+    from google.api_core.exceptions import Conflict
+
+    start = file.tell()
+    for attempt in itertools.count():
+        attempt_id = job_id if not attempt else f"{job_id}_{attempt}"
+        file.seek(start)
+        try:
+            job = client.load_table_from_file(
+                file, f"{project_id}.{destination}", job_config=job_config, job_id=attempt_id
+            )
+        except Conflict:
+            # A previous attempt already submitted this job. Wait on that one
+            # instead, but if it failed, submit again under the next ID.
+            job = client.get_job(attempt_id)
+            try:
+                job.result()
+            except Exception:
+                if job.error_result:
+                    continue
+                raise
+            return job
+        job.result()
+        return job
+
+
+def uploadWithStorageWrite(df, schema, project_id, dataset_id, table_id, streams=STORAGE_WRITE_STREAMS, session=None):
+    """
+    Uploads the DataFrame over several concurrent BigQuery Storage Write API
+    streams and commits them together, so either every row lands or none do.
+    A session built around any object with the BigQueryWriteClient methods can
+    stand in for BigQuery.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from google.cloud.bigquery_storage_v1 import types
+
+    if session is None:
+        session = getSession(project_id)
+    writeClient = session.writeClient
+
+    # Arrow rows are checked against the table's column types as they are.
+    table = _widenToSchema(toArrowTable(df, schema), schema)
+    if table.num_rows == 0:
+        return []
+    parent = f"projects/{project_id}/datasets/{dataset_id}/tables/{table_id}"
+    writer_schema = types.ArrowSchema(serialized_schema=table.schema.serialize().to_pybytes())
+
+    # Keep each AppendRows request under the API's 10 MB limit.
+    row_bytes = max(1, table.nbytes // max(1, table.num_rows))
+    rows_per_request = max(1, STORAGE_WRITE_REQUEST_BYTES // row_bytes)
+
+    streams = max(1, min(streams, table.num_rows))
+    rows_per_stream = -(-table.num_rows // streams)
+    parts = [table.slice(start, rows_per_stream) for start in range(0, table.num_rows, rows_per_stream)]
+
+    def writeStream(part):
+        start = time.perf_counter()
+        stream = writeClient.create_write_stream(
+            parent=parent,
+            write_stream=types.WriteStream(type_=types.WriteStream.Type.PENDING),
+        )
+
+        def requests():
+            for offset in range(0, part.num_rows, rows_per_request):
+                for batch in part.slice(offset, rows_per_request).to_batches():
+                    yield types.AppendRowsRequest(
+                        write_stream=stream.name,
+                        offset=offset,
+                        arrow_rows=types.AppendRowsRequest.ArrowData(
+                            writer_schema=writer_schema,
+                            rows=types.ArrowRecordBatch(serialized_record_batch=batch.serialize().to_pybytes()),
+                        ),
+                    )
+                    offset += batch.num_rows
+
+        responses = writeClient.append_rows(
+            requests(), metadata=(("x-goog-request-params", f"write_stream={stream.name}"),)
+        )
+        for response in responses:
+            if response.error.code:
+                raise RuntimeError(f"Stream {stream.name} failed: {response.error.message}")
+
+        writeClient.finalize_write_stream(name=stream.name)
+        return stream.name, part.num_rows, part.nbytes, max(time.perf_counter() - start, 1e-6)
+
+    with ThreadPoolExecutor(max_workers=len(parts)) as pool:
+        results = list(pool.map(writeStream, parts))
+
+    # Nothing is visible in the table until the pending streams are committed.
+    response = writeClient.batch_commit_write_streams(
+        request=types.BatchCommitWriteStreamsRequest(
+            parent=parent, write_streams=[name for name, _, _, _ in results]
+        )
+    )
+    if response.stream_errors:
+        raise RuntimeError(f"Commit to {dataset_id}.{table_id} failed: {response.stream_errors}")
+
+    for number, (_, rows, nbytes, seconds) in enumerate(results, start=1):
+        print(
+            Fore.BLUE
+            + f"Stream {number}: {rows} rows in {seconds:.1f}s "
+            + f"({rows / seconds:,.0f} rows/s, {nbytes / seconds / 1e6:.1f} MB/s)"
+        )
+    return results
+
+
+def withRetry(action, description, attempts=UPLOAD_RETRIES):
+    """
+    Runs action(), retrying with exponential backoff if it raises.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return action()
+        except Exception as error:
+            if attempt == attempts:
+                raise
+            delay = RETRY_BASE_SECONDS * 2 ** (attempt - 1) + random.uniform(0, 1)
+            print(Fore.YELLOW + f"{description} failed ({error}). Retry {attempt} of {attempts - 1} in {delay:.1f}s...")
+            time.sleep(delay)
+
+
+def _checkpointPath(dataset_id, table_id):
+    return os.path.join(CHECKPOINT_FOLDER, f"{dataset_id}.{table_id}.json")
+
+
+def _fingerprint(df):
+    import hashlib
+
+    # entryID is today's date, so leave it out or a rerun tomorrow would not
+    # recognise the same file.
+    return hashlib.sha1(
+        pd.util.hash_pandas_object(df.drop(columns=["entryID"], errors="ignore"), index=False).values
+    ).hexdigest()
+
+
+def hasPendingUpload(dataset_id, table_id, df=None):
+    """
+    Returns True if an earlier chunked upload to the table was interrupted.
+    Given df, only if that upload was of the same rows.
+    """
+    path = _checkpointPath(dataset_id, table_id)
+    if not os.path.exists(path):
+        return False
+    if df is None:
+        return True
+    if not isinstance(df, pd.DataFrame):
+        return False
+    with open(path) as file:
+        return json.load(file)["fingerprint"] == _fingerprint(df)
+
+
+def _resumesUpload(dataset_id, table_id, df):
+    """
+    Returns True if uploading df resumes an interrupted upload to the table.
+    A checkpoint left by an upload of other rows is discarded, since the
+    upload that follows will not resume it.
+    """
+    if hasPendingUpload(dataset_id, table_id, df):
+        return df is not None
+    path = _checkpointPath(dataset_id, table_id)
+    if os.path.exists(path):
+        print(Fore.YELLOW + f"Discarding the checkpoint of an interrupted upload of other rows to {table_id}.")
+        os.remove(path)
+    return False
+
+
+def _saveCheckpoint(path, checkpoint):
+    # Write to a temporary file first so a crash never leaves half a checkpoint.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as file:
+        json.dump(checkpoint, file, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def uploadInChunks(df, schema, project_id, dataset_id, table_id, session=None):
+    """
+    Uploads the DataFrame in chunks of Parquet load jobs, checkpointing each
+    committed chunk so an interrupted upload resumes from where it stopped.
+    """
+    import uuid
+
+    fingerprint = _fingerprint(df)
+
+    path = _checkpointPath(dataset_id, table_id)
+    if os.path.exists(path):
+        with open(path) as file:
+            checkpoint = json.load(file)
+        if checkpoint["fingerprint"] != fingerprint:
+            raise RuntimeError(
+                f"An interrupted upload of a different file to {dataset_id}.{table_id} is pending. "
+                f"Rerun with the original file, or delete '{path}' and clear the table's partial data first."
+            )
+        checkpoint.setdefault("nonce", uuid.uuid4().hex)
+        checkpoint.setdefault("pending", None)
+        print(Fore.YELLOW + f"Resuming upload at row {checkpoint['committedRows']} of {len(df)}.")
+    else:
+        # The nonce is new for every upload, so a job left over from an earlier
+        # upload of the same file is never mistaken for one of this upload's chunks.
+        checkpoint = {
+            "fingerprint": fingerprint,
+            "nonce": uuid.uuid4().hex,
+            "rows": len(df),
+            "committedRows": 0,
+            "pending": None,
+            "chunks": [],
+        }
+        _saveCheckpoint(path, checkpoint)
+
+    # Size the first chunk from the observed row width.
+    sample = df.head(1000)
+    row_bytes = max(1, sample.memory_usage(index=False, deep=True).sum() // max(1, len(sample)))
+    chunk_rows = max(CHUNK_MIN_ROWS, CHUNK_START_BYTES // row_bytes)
+
+    start = checkpoint["committedRows"]
+    while start < len(df):
+        # Record the range before submitting it. If the run dies mid-job, the
+        # resume resubmits exactly this range under the same job ID, so
+        # BigQuery reports the job as already run instead of loading it twice.
+        if checkpoint["pending"] is None:
+            checkpoint["pending"] = [start, min(start + chunk_rows, len(df))]
+            _saveCheckpoint(path, checkpoint)
+        start, end = checkpoint["pending"]
+        chunk = df.iloc[start:end]
+        job_id = f"dataUploaders_{table_id}_{checkpoint['nonce']}_{start}_{end}".replace("-", "_")
+
+        began = time.perf_counter()
+        withRetry(
+            lambda: loadParquetToBigQuery(
+                chunk, schema, project_id, f"{dataset_id}.{table_id}", session=session, job_id=job_id
+            ),
+            f"Chunk at row {start}",
+        )
+        seconds = max(time.perf_counter() - began, 1e-6)
+
+        start = end
+        checkpoint["committedRows"] = start
+        checkpoint["pending"] = None
+        checkpoint["chunks"].append({"rows": len(chunk), "seconds": round(seconds, 2)})
+        _saveCheckpoint(path, checkpoint)
+        print(Fore.BLUE + f"Uploaded {start} of {len(df)} rows ({len(chunk) / seconds:,.0f} rows/s).")
+
+        # Resize the next chunk toward CHUNK_TARGET_SECONDS, at most doubling
+        # or halving it at a time.
+        scale = min(2.0, max(0.5, CHUNK_TARGET_SECONDS / seconds))
+        chunk_rows = max(CHUNK_MIN_ROWS, int(len(chunk) * scale))
+
+    os.remove(path)
+
+
+def mergeIntoBigQuery(df, schema, project_id, dataset_id, table_id, keyColumns, scopeColumn="date", session=None):
+    """
+    Replaces the table's rows for the DataFrame's date range in one atomic MERGE.
+
+    The frame is loaded into a staging table, then rows are matched on
+    keyColumns: matches are updated, new rows are inserted, and rows in the
+    target whose scopeColumn falls between the frame's min and max but that
+    are not in the frame are deleted. Pass scopeColumn=None to only upsert.
+    If the table does not exist yet, the frame is loaded into a new one.
+    """
+    from google.api_core.exceptions import NotFound
+
+    if session is None:
+        session = getSession(project_id)
+
+    # A row with no scopeColumn would leave the scope's bounds undefined, and
+    # BETWEEN never matches NULL anyway, so leave those rows out.
+    if scopeColumn is not None:
+        missing = df[scopeColumn].isna()
+        if missing.any():
+            print(Fore.YELLOW + f"Skipped {missing.sum()} rows with no {scopeColumn}.")
+            df = df[~missing]
+        if df.empty:
+            print(Fore.YELLOW + f"No rows to merge into {table_id}.")
+            return None
+
+    # MERGE fails if two source rows match the same target row.
+    before = len(df)
+    df = df.drop_duplicates(subset=keyColumns, keep="last")
+    if len(df) < before:
+        print(Fore.YELLOW + f"Dropped {before - len(df)} rows with duplicate {', '.join(keyColumns)}.")
+
+    # On a first run there is nothing to merge into, so the load creates the table.
+    try:
+        session.getTable(f"{project_id}.{dataset_id}.{table_id}")
+    except NotFound:
+        loadParquetToBigQuery(df, schema, project_id, f"{dataset_id}.{table_id}", session=session)
+        print(Fore.BLUE + f"{table_id} did not exist yet; loaded {len(df)} rows into a new table.")
+        return None
+
+    staging_id = f"{table_id}_staging_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    loadParquetToBigQuery(
+        df, schema, project_id, f"{dataset_id}.{staging_id}", session=session, write_disposition="WRITE_TRUNCATE"
+    )
+
+    scope = None if scopeColumn is None else (df[scopeColumn].min(), df[scopeColumn].max())
+    query = _mergeQuery(
+        f"{project_id}.{dataset_id}.{table_id}", f"`{project_id}.{dataset_id}.{staging_id}`",
+        df.columns, keyColumns, scopeColumn, scope,
+    )
+
+    try:
+        job = session.query(query)
+    finally:
+        session.client.delete_table(f"{project_id}.{dataset_id}.{staging_id}", not_found_ok=True)
+
+    print(Fore.BLUE + f"Merged {len(df)} rows into {table_id} ({job.num_dml_affected_rows} rows changed).")
+    return job
+
+
+def _mergeQuery(table_path, source, columns, keyColumns, scopeColumn=None, scope=None):
+    """
+    Builds the MERGE statement used by mergeIntoBigQuery. source is a table
+    reference or a parenthesised subquery; scope is the (min, max) of
+    scopeColumn whose unmatched target rows are deleted.
+    """
+    columns = [f"`{column}`" for column in columns]
+    match = " AND ".join(f"target.`{key}` IS NOT DISTINCT FROM source.`{key}`" for key in keyColumns)
+    query = f"""
+    MERGE `{table_path}` AS target
+    USING {source} AS source
+    ON {match}
+    WHEN MATCHED THEN
+      UPDATE SET {", ".join(f"{column} = source.{column}" for column in columns)}
+    WHEN NOT MATCHED THEN
+      INSERT ({", ".join(columns)}) VALUES ({", ".join(f"source.{column}" for column in columns)})
+    """
+    if scopeColumn is not None:
+        query += f"""WHEN NOT MATCHED BY SOURCE
+      AND target.`{scopeColumn}` BETWEEN '{scope[0]}' AND '{scope[1]}' THEN
+      DELETE
+    """
+    return query
+
+
+def replacePartitions(df, schema, project_id, dataset_id, table_id, partitionColumn="date", session=None):
+    """
+    Overwrites the daily partitions covered by the DataFrame, one WRITE_TRUNCATE
+    load job per distinct date into `table$YYYYMMDD`. Each swap only touches
+    partition metadata, so it costs the same however large the table is.
+    The table must be partitioned by day on partitionColumn.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if session is None:
+        session = getSession(project_id)
+
+    days = pd.to_datetime(df[partitionColumn], errors="coerce").dt.strftime("%Y%m%d")
+    if days.isna().any():
+        print(Fore.YELLOW + f"Skipped {days.isna().sum()} rows with no {partitionColumn}.")
+
+    def loadPartition(group):
+        day, rows = group
+        loadParquetToBigQuery(
+            rows, schema, project_id, f"{dataset_id}.{table_id}${day}",
+            session=session, write_disposition="WRITE_TRUNCATE",
+        )
+        return day
+
+    with ThreadPoolExecutor(max_workers=PARTITION_LOAD_WORKERS) as pool:
+        replaced = list(pool.map(loadPartition, df.groupby(days, sort=True)))
+
+    if replaced:
+        print(Fore.BLUE + f"Replaced {len(replaced)} daily partitions of {table_id} ({replaced[0]} to {replaced[-1]}).")
+    return replaced
+
+
+def isPartitionedOn(project_id, dataset_id, table_id, column, session=None):
+    """
+    Returns True if the table is partitioned by day on the given column, and
+    False if it is not or does not exist yet.
+    """
+    from google.api_core.exceptions import NotFound
+
+    if session is None:
+        session = getSession(project_id)
+
+    try:
+        partitioning = session.getTable(f"{project_id}.{dataset_id}.{table_id}").time_partitioning
+    except NotFound:
+        return False
+    return partitioning is not None and partitioning.field == column and partitioning.type_ == "DAY"
+
+
+def uploadToBigQuery(
+    df, schema, project_id, dataset_id, table_id, engine=None, session=None, resumable=None,
+    mode="append", keyColumns=None, scopeColumn="date",
+):
     """
     Uploads a pandas DataFrame to a BigQuery table.
+
+    mode is "append" (add the rows), "merge" (replace the rows for the
+    frame's date range in one MERGE keyed on keyColumns; see mergeIntoBigQuery)
+    or "partitions" (overwrite each day's partition; see replacePartitions).
+    "partitions" falls back to "merge" when the table is not partitioned on
+    scopeColumn and keyColumns are given.
+    Use either instead of deleteDataBetweenDates followed by an append.
+
+    df may also be a CSVSpool from spoolCSV (see uploadSpoolToBigQuery).
+
+    engine is "gbq" (pandas_gbq.to_gbq), "parquet" (one Parquet load job) or
+    "storage" (parallel Storage Write API streams, for the largest tables).
+    By default frames with PARQUET_ROW_THRESHOLD rows or more use "parquet".
+
+    resumable uploads the frame in checkpointed Parquet chunks (see
+    uploadInChunks). By default it is used for frames with
+    RESUMABLE_ROW_THRESHOLD rows or more when no engine is given.
     """
+    if mode not in ("append", "merge", "partitions"):
+        raise ValueError(f"Unknown upload mode '{mode}'. Use 'append', 'merge' or 'partitions'.")
+    if isinstance(df, CSVSpool):
+        uploadSpoolToBigQuery(df, project_id, dataset_id, table_id, mode, keyColumns, scopeColumn, session=session)
+        return
+    if mode == "partitions":
+        print(Fore.BLUE + "Replacing daily partitions in BigQuery...")
+        if DRY_RUN:
+            print(Fore.YELLOW + f"Dry run: skipped replacing {dataset_id}.{table_id} partitions for {len(df)} rows.")
+            return
+        if isPartitionedOn(project_id, dataset_id, table_id, scopeColumn, session=session):
+            replacePartitions(df, schema, project_id, dataset_id, table_id, scopeColumn, session=session)
+            return
+        if not keyColumns:
+            raise ValueError(f"{dataset_id}.{table_id} is not partitioned by day on '{scopeColumn}'.")
+        print(Fore.YELLOW + f"{table_id} is not partitioned on {scopeColumn}; merging instead.")
+        mode = "merge"
+    if mode == "merge":
+        if not keyColumns:
+            raise ValueError("mode='merge' needs keyColumns.")
+        print(Fore.BLUE + "Merging data into BigQuery...")
+        if DRY_RUN:
+            print(Fore.YELLOW + f"Dry run: skipped merging {len(df)} rows into {dataset_id}.{table_id}.")
+            return
+        mergeIntoBigQuery(df, schema, project_id, dataset_id, table_id, keyColumns, scopeColumn, session=session)
+        return
+
+    if resumable is None:
+        resumable = engine is None and len(df) >= RESUMABLE_ROW_THRESHOLD
+    if resumable:
+        print(Fore.BLUE + "Uploading data to BigQuery in resumable chunks...")
+        if DRY_RUN:
+            print(Fore.YELLOW + f"Dry run: skipped uploading {len(df)} rows to {dataset_id}.{table_id}.")
+            return
+        uploadInChunks(df, schema, project_id, dataset_id, table_id, session=session)
+        print(Fore.BLUE + "Data has been uploaded to BigQuery.")
+        return
+
+    if engine is None:
+        engine = "parquet" if len(df) >= PARQUET_ROW_THRESHOLD else "gbq"
+    if engine not in ("gbq", "parquet", "storage"):
+        raise ValueError(f"Unknown upload engine '{engine}'. Use 'gbq', 'parquet' or 'storage'.")
 
     print(Fore.BLUE + "Uploading data to BigQuery...")
+    if DRY_RUN:
+        print(Fore.YELLOW + f"Dry run: skipped uploading {len(df)} rows to {dataset_id}.{table_id}.")
+        return
+
+    if engine == "parquet":
+        loadParquetToBigQuery(df, schema, project_id, f"{dataset_id}.{table_id}", session=session)
+        print(Fore.BLUE + "Data has been uploaded to BigQuery.")
+        return
+
+    if engine == "storage":
+        uploadWithStorageWrite(df, schema, project_id, dataset_id, table_id, session=session)
+        print(Fore.BLUE + "Data has been uploaded to BigQuery.")
+        return
+
+    import pandas_gbq
+
+    if session is None:
+        session = getSession(project_id)
+
     # Upload the dataframe
     pandas_gbq.to_gbq(
-        df,
+        _decategorize(df),
         destination_table=dataset_id + "." + table_id,
         project_id=project_id,
+        bigquery_client=session.client,
         if_exists="append",
         progress_bar=True,
         table_schema=schema,
@@ -74,73 +961,964 @@ def uploadToBigQuery(df, schema, project_id, dataset_id, table_id):
     print(Fore.BLUE + "Data has been uploaded to BigQuery.")
 
 
+def uploadSpoolToBigQuery(spool, project_id, dataset_id, table_id, mode="append", keyColumns=None, scopeColumn="date", session=None):
+    """
+    Uploads the rows in a CSVSpool straight from its Parquet file, so they are
+    never all in memory. mode works as in uploadToBigQuery: "append" is one
+    load job, "partitions" splits the spool by day in one pass and overwrites
+    each day, and "merge" loads a staging table and merges it, keeping the
+    last row per key.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import uuid
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    spool.close()
+    if DRY_RUN:
+        print(Fore.YELLOW + f"Dry run: skipped uploading {len(spool)} rows to {dataset_id}.{table_id} ({mode}).")
+        return
+    if session is None:
+        session = getSession(project_id)
+
+    def loadFile(destination, write_disposition, path=None):
+        job_id = f"dataUploaders_{table_id}_{uuid.uuid4().hex}".replace("-", "_")
+
+        def load():
+            with open(path or spool.path, "rb") as file:
+                return loadParquetFileToBigQuery(file, project_id, destination, session, write_disposition, job_id)
+
+        return withRetry(load, f"Loading {destination}")
+
+    if mode == "partitions":
+        print(Fore.BLUE + "Replacing daily partitions in BigQuery...")
+        if isPartitionedOn(project_id, dataset_id, table_id, scopeColumn, session=session):
+            day_paths = _splitSpoolByDay(spool, scopeColumn)
+
+            def loadPartition(item):
+                day, path = item
+                if spool.deduplicate:
+                    rows = pq.read_table(path)
+                    rows = pa.Table.from_pandas(rows.to_pandas().drop_duplicates(), schema=rows.schema, preserve_index=False)
+                    pq.write_table(rows, path, compression="zstd")
+                loadFile(f"{dataset_id}.{table_id}${day:%Y%m%d}", "WRITE_TRUNCATE", path)
+                return day
+
+            with ThreadPoolExecutor(max_workers=PARTITION_LOAD_WORKERS) as pool:
+                replaced = list(pool.map(loadPartition, sorted(day_paths.items())))
+            if replaced:
+                print(Fore.BLUE + f"Replaced {len(replaced)} daily partitions of {table_id} ({replaced[0]} to {replaced[-1]}).")
+            return
+        if not keyColumns:
+            raise ValueError(f"{dataset_id}.{table_id} is not partitioned by day on '{scopeColumn}'.")
+        print(Fore.YELLOW + f"{table_id} is not partitioned on {scopeColumn}; merging instead.")
+        mode = "merge"
+
+    if mode == "merge":
+        if not keyColumns:
+            raise ValueError("mode='merge' needs keyColumns.")
+        print(Fore.BLUE + "Merging data into BigQuery...")
+        staging_path = f"{project_id}.{dataset_id}.{table_id}_staging_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        loadFile(staging_path.split(".", 1)[1], "WRITE_TRUNCATE", _numberSpoolRows(spool))
+
+        scope = None
+        if scopeColumn is not None:
+            bounds = pc.min_max(pq.read_table(spool.path, columns=[scopeColumn]).column(scopeColumn))
+            scope = (bounds["min"].as_py(), bounds["max"].as_py())
+
+        # The chunks were cleaned separately, so drop duplicate keys here; MERGE
+        # fails if two source rows match the same target row. As in
+        # mergeIntoBigQuery, the last row in the file wins.
+        keys = ", ".join(f"`{key}`" for key in keyColumns)
+        source = (
+            f"(SELECT * FROM `{staging_path}` WHERE TRUE "
+            f"QUALIFY ROW_NUMBER() OVER (PARTITION BY {keys} ORDER BY `{SPOOL_ROW_COLUMN}` DESC) = 1)"
+        )
+        try:
+            job = session.query(
+                _mergeQuery(f"{project_id}.{dataset_id}.{table_id}", source, spool.columns, keyColumns, scopeColumn, scope)
+            )
+        finally:
+            session.client.delete_table(staging_path, not_found_ok=True)
+        print(Fore.BLUE + f"Merged {len(spool)} rows into {table_id} ({job.num_dml_affected_rows} rows changed).")
+        return
+
+    print(Fore.BLUE + "Uploading data to BigQuery...")
+    if not spool.deduplicate:
+        loadFile(f"{dataset_id}.{table_id}", "WRITE_APPEND")
+        print(Fore.BLUE + "Data has been uploaded to BigQuery.")
+        return
+
+    # Rows repeated across the files are dropped in BigQuery, where all of them are.
+    from google.cloud import bigquery
+
+    staging_path = f"{project_id}.{dataset_id}.{table_id}_staging_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    loadFile(staging_path.split(".", 1)[1], "WRITE_TRUNCATE")
+    columns = ", ".join(f"`{column}`" for column in spool.columns)
+    job_config = bigquery.QueryJobConfig(
+        destination=f"{project_id}.{dataset_id}.{table_id}", write_disposition="WRITE_APPEND"
+    )
+    try:
+        query = f"SELECT DISTINCT {columns} FROM `{staging_path}`"
+        distinct = session.client.query(query, job_config=job_config).result().total_rows
+    finally:
+        session.client.delete_table(staging_path, not_found_ok=True)
+    print(Fore.BLUE + f"Uploaded {distinct} rows to BigQuery ({len(spool) - distinct} duplicates dropped).")
+
+
+def _splitSpoolByDay(spool, column):
+    """
+    Writes the spool's rows to one Parquet file per day of column in a
+    single pass over the spool, and returns {day: path}. Rows with no day
+    are skipped.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    folder = os.path.join(spool.folder, "days")
+    os.makedirs(folder, exist_ok=True)
+    writers, paths, skipped = {}, {}, 0
+    try:
+        for batch in pq.ParquetFile(spool.path).iter_batches():
+            rows = pa.Table.from_batches([batch])
+            days = rows.column(column)
+            skipped += days.null_count
+            for day in pc.unique(days).to_pylist():
+                if day is None:
+                    continue
+                if day not in writers:
+                    paths[day] = os.path.join(folder, f"{day:%Y%m%d}.parquet")
+                    writers[day] = pq.ParquetWriter(paths[day], rows.schema, compression="zstd")
+                writers[day].write_table(rows.filter(pc.equal(days, pa.scalar(day, days.type))))
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    if skipped:
+        print(Fore.YELLOW + f"Skipped {skipped} rows with no {column}.")
+    return paths
+
+
+def _numberSpoolRows(spool):
+    """
+    Writes a copy of the spool with a SPOOL_ROW_COLUMN holding each row's
+    position, and returns its path.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = os.path.join(spool.folder, "numbered.parquet")
+    writer, start = None, 0
+    try:
+        for batch in pq.ParquetFile(spool.path).iter_batches():
+            rows = pa.Table.from_batches([batch])
+            rows = rows.append_column(SPOOL_ROW_COLUMN, pa.array(range(start, start + rows.num_rows), pa.int64()))
+            start += rows.num_rows
+            if writer is None:
+                writer = pq.ParquetWriter(path, rows.schema, compression="zstd")
+            writer.write_table(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def readScriptSettings(script_path):
+    """
+    Reads project_id, dataset_id, table_id and the table schema from an
+    uploader script without running it.
+    """
+    import ast
+
+    with open(script_path) as file:
+        tree = ast.parse(file.read())
+
+    settings = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            try:
+                settings[node.targets[0].id] = ast.literal_eval(node.value)
+            except ValueError:
+                pass  # not a plain value, e.g. an f-string or a function call
+
+    # Most scripts call it tableSchema, a few call it schema.
+    settings["tableSchema"] = settings.get("tableSchema", settings.get("schema"))
+    return settings
+
+
+def tableLayout(schema, partitionColumn=None):
+    """
+    Picks the partition column and clustering columns for a table schema:
+    day partitions on the script's partitionColumn if it is a DATE column,
+    clustered by id plus the first of CLUSTER_SECOND_KEYS the table has.
+    """
+    types = {field["name"]: field["type"] for field in schema}
+
+    partition_column = None
+    if partitionColumn is not None:
+        if types.get(partitionColumn) != "DATE":
+            raise ValueError(f"Cannot partition on '{partitionColumn}': it is not a DATE column in the schema.")
+        partition_column = partitionColumn
+
+    cluster_columns = []
+    if "id" in types:
+        cluster_columns.append("id")
+    second = next((column for column in CLUSTER_SECOND_KEYS if column in types), None)
+    if second:
+        cluster_columns.append(second)
+
+    return partition_column, cluster_columns
+
+
+def dryRunBytes(query, session):
+    """
+    Returns the bytes BigQuery estimates a query would scan, without running it.
+    """
+    from google.cloud import bigquery
+
+    job = session.client.query(query, job_config=bigquery.QueryJobConfig(dry_run=True, use_query_cache=False))
+    return job.total_bytes_processed
+
+
+def _scanEstimates(table_path, partition_column, session):
+    """
+    Estimates bytes scanned by a recent date-range query and a single-student query.
+    """
+    estimates = {}
+    if partition_column:
+        estimates["last 7 days"] = dryRunBytes(
+            f"SELECT * FROM `{table_path}` "
+            f"WHERE `{partition_column}` >= DATE_SUB(CURRENT_DATE(), INTERVAL 7 DAY)",
+            session,
+        )
+    estimates["one student"] = dryRunBytes(f"SELECT * FROM `{table_path}` WHERE id = 0", session)
+    return estimates
+
+
+def provisionTable(schema, project_id, dataset_id, table_id, partitionColumn=None, clusterColumns=None, session=None):
+    """
+    Creates the table from its schema, partitioned and clustered as
+    tableLayout picks from the schema and partitionColumn. If the table exists
+    without that layout it is rebuilt with its data (see _rebuildTable), or
+    only reclustered when its partitioning already matches. The bytes a
+    date-range query and a per-student query would scan are reported before
+    and after.
+    """
+    from google.api_core.exceptions import NotFound
+    from google.cloud import bigquery
+
+    if session is None:
+        session = getSession(project_id)
+    client = session.client
+
+    partitionColumn, default_cluster = tableLayout(schema, partitionColumn)
+    clusterColumns = clusterColumns or default_cluster
+
+    table_path = f"{project_id}.{dataset_id}.{table_id}"
+    layout = f"partitioned by {partitionColumn or 'nothing'}, clustered by {', '.join(clusterColumns) or 'nothing'}"
+    try:
+        existing = session.getTable(table_path)
+    except NotFound:
+        existing = None
+
+    if existing is not None:
+        partitioning = existing.time_partitioning
+        current_partition = partitioning.field if partitioning else None
+        if current_partition == partitionColumn and (existing.clustering_fields or []) == clusterColumns:
+            print(Fore.GREEN + f"{table_id} is already {layout}.")
+            return existing
+
+    if DRY_RUN:
+        if existing is None:
+            action = "create"
+        else:
+            action = "recluster" if current_partition == partitionColumn else "rebuild"
+        print(Fore.YELLOW + f"Dry run: would {action} {table_id} {layout}.")
+        return existing
+
+    if existing is None:
+        table = bigquery.Table(table_path, schema=[bigquery.SchemaField(f["name"], f["type"]) for f in schema])
+        if partitionColumn:
+            table.time_partitioning = bigquery.TimePartitioning(type_="DAY", field=partitionColumn)
+        table.clustering_fields = clusterColumns or None
+        table = client.create_table(table)
+        session.forgetTable(table_path)
+        print(Fore.GREEN + f"Created {table_id} {layout}.")
+        return table
+
+    before = _scanEstimates(table_path, partitionColumn, session)
+
+    if current_partition == partitionColumn:
+        # Clustering can be changed in place; it applies to data written from now on.
+        existing.clustering_fields = clusterColumns or None
+        client.update_table(existing, ["clustering_fields"])
+        session.forgetTable(table_path)
+    else:
+        _rebuildTable(existing, table_path, partitionColumn, clusterColumns, client)
+        session.forgetTable(table_path)
+        print(Fore.BLUE + f"Rebuilt {table_id} {layout}.")
+
+    after = _scanEstimates(table_path, partitionColumn, session)
+    print(Fore.GREEN + f"{table_id} is now {layout}. Estimated bytes scanned:")
+    for query in after:
+        print(f"  {query:<12} before {before[query]:>15,}  after {after[query]:>15,}")
+    print(Fore.CYAN + "  Estimates include partition pruning only; clustering saves more on real queries.")
+    return session.getTable(table_path)
+
+
+def _rebuildTable(existing, table_path, partitionColumn, clusterColumns, client):
+    """
+    Recreates the table with a new partitioning and clustering and its data.
+    BigQuery cannot change a table's partitioning in place, nor replace a
+    table with one partitioned differently, so the data is copied to a
+    backup, the table is dropped and recreated, and the rows are copied back.
+    """
+    from google.cloud import bigquery
+
+    backup_path = f"{table_path}_backup"
+    print(Fore.BLUE + f"Backing up {table_path} to {backup_path}...")
+    client.copy_table(
+        table_path, backup_path, job_config=bigquery.CopyJobConfig(write_disposition="WRITE_TRUNCATE")
+    ).result()
+
+    try:
+        client.delete_table(table_path)
+        table = bigquery.Table(table_path, schema=existing.schema)
+        if partitionColumn:
+            table.time_partitioning = bigquery.TimePartitioning(type_="DAY", field=partitionColumn)
+        table.clustering_fields = clusterColumns or None
+        client.create_table(table)
+        client.query(f"INSERT INTO `{table_path}` SELECT * FROM `{backup_path}`").result()
+    except Exception:
+        print(Fore.RED + f"Rebuilding {table_path} failed. Its data is kept in {backup_path}.")
+        raise
+    client.delete_table(backup_path)
+
+
 def archiveSourceFile(df, sourceFile, sourceFolder, archiveFileName):
     """
     Moves the source file to an archive directory.
+    sourceFile may be a list of files read together, and df may also be a
+    CSVSpool from spoolCSV. The cleaned rows are saved as CSV, or as Parquet
+    if ARCHIVE_FORMAT is "parquet".
     """
     destination_folder = "../dataUploaders/archivedFiles"
+    sourceFiles = [sourceFile] if isinstance(sourceFile, str) else sourceFile
+    names = ", ".join(f"'{name}'" for name in sourceFiles)
+
+    if DRY_RUN:
+        print(Fore.YELLOW + f"Dry run: left {names} in place.")
+        return
 
     current_datetime = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    new_file_name = f"{archiveFileName}-{current_datetime}.csv"
+    extension = "parquet" if ARCHIVE_FORMAT == "parquet" else "csv"
+    new_file_name = f"{archiveFileName}-{current_datetime}.{extension}"
     destination_file_path = os.path.join(destination_folder, new_file_name)
-    df.to_csv(destination_file_path, index=False)
-    os.remove(os.path.join(sourceFolder, sourceFile))
-    print(Fore.GREEN + f"File '{sourceFile}' has been archived as '{new_file_name}'.")
+    if isinstance(df, CSVSpool):
+        # The spool already wrote the cleaned rows out chunk by chunk.
+        import shutil
+        spool_archive = df.close()
+        shutil.move(spool_archive, destination_file_path)
+        df.discard()
+    elif extension == "parquet":
+        # Categorical columns are kept dictionary-encoded.
+        df.to_parquet(destination_file_path, compression="zstd", index=False)
+    else:
+        df.to_csv(destination_file_path, index=False)
+    for name in sourceFiles:
+        os.remove(os.path.join(sourceFolder, name))
+    print(Fore.GREEN + f"File {names} has been archived as '{new_file_name}'.")
 
 
-def readCSV(source_folder):
+# pandas dtypes to parse each BigQuery type straight into. DATE, TIME and
+# BOOLEAN columns are left as text because each script cleans them its own way.
+CSV_DTYPES = {
+    "INTEGER": "Int64",
+    "FLOAT": "float64",
+    "STRING": str,
+}
+
+
+def csvColumnTypes(source, column_mappings, tableSchema=None):
     """
-    Reads a CSV file and returns the filename found and DataFrame from the read information
+    Works out which columns of the CSV file (a path or an open file) a script
+    uses and the BigQuery type each one ends up as. Returns the column names
+    to read and a dict of {column name: BigQuery type} for the columns that have one.
     """
+    header = _csvHeader(source)
+
+    # Mappings may list columns the script adds itself (e.g. entryID).
+    columns = [column for column in header if column in column_mappings]
+
+    schema_types = {field["name"]: field["type"] for field in tableSchema or []}
+    types = {
+        column: schema_types[column_mappings[column]]
+        for column in columns
+        if schema_types.get(column_mappings[column]) in CSV_DTYPES
+    }
+    return columns, types
+
+
+def _csvHeader(source):
+    import csv
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline="", encoding="utf-8-sig") as file:
+            return next(csv.reader(file), [])
+
+    # An open file or buffer: read the header line and step back to it.
+    position = source.tell()
+    line = source.readline()
+    source.seek(position)
+    if isinstance(line, bytes):
+        line = line.decode("utf-8-sig")
+    return next(csv.reader([line]), [])
+
+
+def readCSV(source_folder, engine="c", column_mappings=None, tableSchema=None, prepare=None):
+    """
+    Reads every CSV file in the folder and returns the list of filenames found
+    and one DataFrame of their rows. Files are parsed in parallel; when there
+    are several, repeated rows (e.g. from overlapping exports) are kept once.
+    A single file's rows are all kept. spoolCSV follows the same rule.
+
+    If the folder has no CSV files, the list is empty and so is the DataFrame;
+    the script decides what to do about it.
+
+    engine is "c" (pandas' parser) or "pyarrow" (Arrow's multithreaded parser,
+    which returns Arrow-backed columns and is faster on large exports).
+
+    Given the script's column_mappings, only the mapped columns are read. Given
+    its tableSchema as well, INTEGER, FLOAT and STRING columns are parsed as
+    their final types instead of being cast afterwards.
+
+    prepare is an optional step for exports that need fixing before they can
+    be parsed. It is called with each file's path and returns the fixed
+    contents in memory: an open file or buffer positioned at the header row
+    (parsed as above), a DataFrame, or a pyarrow Table. The source file itself
+    is never rewritten.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
     print(Fore.GREEN + "Opening the CSV file...")
 
-    csv_files = [f for f in os.listdir(source_folder) if f.endswith(".csv")]
+    csv_files = findCSVFiles(source_folder)
+    if not csv_files:
+        # Leave it to the script to stop; an empty list of files means nothing to upload.
+        print(Fore.YELLOW + f"No CSV files found in '{source_folder}'. Nothing to upload.")
+        return csv_files, pd.DataFrame()
 
-    if csv_files:
-        csv_file = csv_files[0]
-        csv_path = os.path.join(source_folder, csv_file)
+    def readFile(csv_file):
+        source = os.path.join(source_folder, csv_file)
+        if prepare is not None:
+            source = prepare(source)
+
+        try:
+            df = _readSource(source, csv_file, engine, column_mappings, tableSchema)
+        finally:
+            if hasattr(source, "close"):
+                source.close()
 
-        df = pd.read_csv(csv_path).dropna(how="all")
         print(
             Fore.GREEN
             + f"File '{csv_file}' has been read. Empty rows have been removed."
         )
-        return csv_file, df
+        return df
 
-def convertToStandardDate(date_str):
-    # if date_str is null, return null
-    if pd.isnull(date_str):
-        return None
+    with ThreadPoolExecutor(max_workers=min(len(csv_files), CSV_READ_WORKERS)) as pool:
+        frames = list(pool.map(readFile, csv_files))
+
+    if len(frames) == 1:
+        return csv_files, frames[0]
+
+    df = pd.concat(frames, ignore_index=True)
+    before = len(df)
+    df = df.drop_duplicates(ignore_index=True)
+    print(Fore.GREEN + f"Combined {len(csv_files)} files into {len(df)} rows ({before - len(df)} duplicates dropped).")
+    return csv_files, df
+
+
+def _isArrowTable(source):
+    return type(source).__module__.startswith("pyarrow") and hasattr(source, "to_pandas")
 
-    month, day, year = map(int, date_str.split("/"))
-    if year < 100:
-        if year >= 50:
-            year += 1900
+
+def _readSource(source, csv_file, engine, column_mappings=None, tableSchema=None):
+    """
+    Turns what readCSV's prepare step returned (or the file's path) into a
+    DataFrame without empty rows.
+    """
+    if isinstance(source, pd.DataFrame) or _isArrowTable(source):
+        if _isArrowTable(source):
+            df = _dropEmptyRows(source).to_pandas(types_mapper=pd.ArrowDtype)
         else:
-            year += 2000
-    return f"{year:04d}-{month:02d}-{day:02d}"
+            df = source.dropna(how="all")
+        if column_mappings:
+            df = df[[column for column in df.columns if column in column_mappings]]
+        return df
 
-def convertToStandardTime(time_str):
-    # if time_str is null, return null
-    if pd.isnull(time_str):
-        return None
+    columns, types = None, {}
+    if column_mappings:
+        columns, types = csvColumnTypes(source, column_mappings, tableSchema)
 
-    hour, minute, second = map(int, time_str.split(":"))
-    return f"{hour:02d}:{minute:02d}:{second:02d}"
+    position = None if isinstance(source, (str, os.PathLike)) else source.tell()
+    try:
+        return _readCSVFile(source, engine, columns, types)
+    except ValueError as e:
+        # A value that doesn't fit its column's type (e.g. text in an ID
+        # column) is left for the script's cleaning to deal with.
+        print(Fore.YELLOW + f"Could not read '{csv_file}' with its column types ({e}). Reading it without them.")
+        if position is not None:
+            source.seek(position)
+        return _readCSVFile(source, engine, columns, {})
 
-def getSchoolYear(date):
-    year = int(date.split('-')[0]) % 100
-    month = int(date.split('-')[1])
-    if month > 7:
-        return f"SY{year+1}"
+
+def findCSVFiles(source_folder):
+    """
+    Returns the names of the .csv files in the folder, sorted so exports
+    named by date are read oldest first.
+    """
+    return sorted(f for f in os.listdir(source_folder) if f.endswith(".csv"))
+
+
+def shouldStream(source_folder):
+    """
+    Returns True if the folder's CSV files are too large to read whole within
+    the memory budget (see MEMORY_BUDGET_BYTES), so they should go through spoolCSV.
+    """
+    size = sum(os.path.getsize(os.path.join(source_folder, f)) for f in findCSVFiles(source_folder))
+    return size * CSV_MEMORY_FACTOR > MEMORY_BUDGET_BYTES
+
+
+def readCSVInChunks(source_folder, engine="c", column_mappings=None, tableSchema=None, chunkBytes=None, prepare=None):
+    """
+    Like readCSV, but returns the filenames and an iterator of DataFrames, each
+    parsed from about chunkBytes of a file (a quarter of the memory budget's
+    share by default). Files are read one after another, and rows repeated
+    across them are not dropped here; spoolCSV drops them on upload. A prepare step that returns a DataFrame or
+    Table gives one chunk per file; return an open file to keep streaming.
+    """
+    csv_files = findCSVFiles(source_folder)
+    if not csv_files:
+        print(Fore.YELLOW + f"No CSV files found in '{source_folder}'. Nothing to upload.")
+        return csv_files, iter(())
+
+    if chunkBytes is None:
+        chunkBytes = MEMORY_BUDGET_BYTES // (CSV_MEMORY_FACTOR * 4)
+
+    def chunks():
+        for csv_file in csv_files:
+            source = os.path.join(source_folder, csv_file)
+            if prepare is not None:
+                source = prepare(source)
+
+            try:
+                if isinstance(source, pd.DataFrame) or _isArrowTable(source):
+                    yield _readSource(source, csv_file, engine, column_mappings)
+                    continue
+
+                columns, types = None, {}
+                if column_mappings:
+                    columns, types = csvColumnTypes(source, column_mappings, tableSchema)
+
+                print(Fore.GREEN + f"Reading '{csv_file}' in chunks of about {chunkBytes / 1e6:.1f} MB...")
+                yield from _csvChunks(source, engine, columns, types, chunkBytes)
+            finally:
+                if hasattr(source, "close"):
+                    source.close()
+
+    return csv_files, chunks()
+
+
+def _asBinary(source):
+    # pyarrow reads paths and binary files; hand it text buffers as bytes.
+    import io
+
+    if isinstance(source, io.TextIOBase):
+        return io.BytesIO(source.read().encode())
+    return source
+
+
+def _csvChunks(source, engine, columns, types, chunkBytes):
+    if engine == "pyarrow":
+        import pyarrow as pa
+        import pyarrow.csv as pv
+
+        reader = pv.open_csv(
+            _asBinary(source),
+            read_options=pv.ReadOptions(block_size=chunkBytes),
+            convert_options=_arrowConvertOptions(columns, types),
+        )
+        for batch in reader:
+            table = _dropEmptyRows(pa.Table.from_batches([batch]))
+            if table.num_rows:
+                yield table.to_pandas(types_mapper=pd.ArrowDtype)
+        return
+
+    # pandas chunks by rows, so size them from the line length at the start of the file.
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            sample = file.read(1024 * 1024)
     else:
-        return f"SY{year}"
+        position = source.tell()
+        sample = source.read(1024 * 1024)
+        source.seek(position)
+    if isinstance(sample, str):
+        sample = sample.encode()
+    line_bytes = max(1, len(sample) // max(1, sample.count(b"\n")))
 
+    dtypes = {column: CSV_DTYPES[bq_type] for column, bq_type in types.items()}
+    chunks = pd.read_csv(source, usecols=columns, dtype=dtypes or None, chunksize=max(1, chunkBytes // line_bytes))
+    for chunk in chunks:
+        chunk = chunk.dropna(how="all")
+        if len(chunk):
+            yield chunk
 
-def getSemester(date):
-    month = int(date.split('-')[1])
-    if month > 7:
-        return "S1"
+
+class CSVSpool:
+    """
+    The cleaned rows of a source file too large to hold in memory, kept on
+    disk as Parquet (for the upload) and CSV (for the archive). When
+    ARCHIVE_FORMAT is "parquet" the Parquet file is archived and no CSV is written.
+    uploadToBigQuery and archiveSourceFile take one in place of a DataFrame.
+    """
+
+    def __init__(self, schema):
+        import atexit
+        import tempfile
+
+        self.schema = schema
+        self.folder = tempfile.mkdtemp(prefix="dataUploaders_")
+        self.path = os.path.join(self.folder, "rows.parquet")
+        self.archivePath = os.path.join(self.folder, "rows.csv")
+        self.columns = []
+        self.rows = 0
+        # Set when the rows come from several files, so repeated ones are kept once on upload.
+        self.deduplicate = False
+        self._writer = None
+        # The files are temporary whether or not the run gets as far as archiving.
+        atexit.register(self.discard)
+
+    def __len__(self):
+        return self.rows
+
+    def append(self, df):
+        """
+        Adds a cleaned chunk to both files.
+        """
+        import pyarrow.parquet as pq
+
+        if df.empty:
+            return
+        table = toArrowTable(df, self.schema)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema, compression="zstd")
+            self.columns = list(df.columns)
+        elif table.schema != self._writer.schema:
+            # e.g. a column that is empty in this chunk, which Arrow types as null.
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        if ARCHIVE_FORMAT != "parquet":
+            df.to_csv(self.archivePath, mode="a", header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        """
+        Finishes the Parquet file and returns the path of the file to archive.
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return self.path if ARCHIVE_FORMAT == "parquet" else self.archivePath
+
+    def discard(self):
+        import shutil
+
+        self.close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+
+def spoolCSV(source_folder, cleanData, tableSchema, engine="c", column_mappings=None, prepare=None):
+    """
+    Streams the folder's CSV files through cleanData in chunks and returns the
+    filenames and a CSVSpool of the cleaned rows. Only one chunk is in memory
+    at a time. Nothing is uploaded until the spool is passed to
+    uploadToBigQuery, so a failure part way through leaves the table untouched.
+    With no CSV files, the list is empty and no spool is returned.
+    """
+    csv_files, chunks = readCSVInChunks(source_folder, engine, column_mappings, tableSchema, prepare=prepare)
+    if not csv_files:
+        return csv_files, None
+    if not column_mappings:
+        spool = _spoolChunks(chunks, cleanData, tableSchema)
     else:
-        return "S2"
-    
+        try:
+            spool = _spoolChunks(_markReadErrors(chunks), cleanData, tableSchema)
+        except _CSVReadError as e:
+            print(Fore.YELLOW + f"Could not read the files with their column types ({e}). Reading them without them.")
+            csv_files, chunks = readCSVInChunks(source_folder, engine, column_mappings, prepare=prepare)
+            spool = _spoolChunks(chunks, cleanData, tableSchema)
+
+    # Like readCSV, keep rows repeated across several files once.
+    spool.deduplicate = len(csv_files) > 1
+    return csv_files, spool
+
+
+class _CSVReadError(Exception):
+    """
+    A ValueError raised while parsing a chunk, as opposed to one from cleanData.
+    """
+
+
+def _markReadErrors(chunks):
+    # cleanData runs outside this generator, so only parsing errors are marked.
+    try:
+        yield from chunks
+    except ValueError as e:
+        raise _CSVReadError(e) from e
+
+
+def _spoolChunks(chunks, cleanData, tableSchema):
+    spool = CSVSpool(tableSchema)
+    try:
+        for number, chunk in enumerate(chunks, start=1):
+            spool.append(cleanData(chunk))
+            print(Fore.GREEN + f"Cleaned chunk {number} ({len(spool)} rows so far).")
+    except BaseException:
+        spool.discard()
+        raise
+    return spool
+
+
+def _readCSVFile(csv_path, engine, columns=None, types=None):
+    """
+    Reads one CSV file with the chosen engine, keeping only the given columns
+    and parsing them as the given BigQuery types.
+    """
+    if engine == "pyarrow":
+        return readCSVWithArrow(_asBinary(csv_path), columns, types)
+
+    dtypes = {column: CSV_DTYPES[bq_type] for column, bq_type in (types or {}).items()}
+    return pd.read_csv(csv_path, usecols=columns, dtype=dtypes or None).dropna(how="all")
+
+
+def readCSVWithArrow(csv_path, columns=None, types=None):
+    """
+    Reads a CSV file with pyarrow's multithreaded reader into an Arrow-backed
+    DataFrame, leaving out rows where every cell is empty.
+    """
+    import pyarrow.csv as pv
+
+    table = pv.read_csv(
+        csv_path,
+        read_options=pv.ReadOptions(use_threads=True),
+        convert_options=_arrowConvertOptions(columns, types),
+    )
+    return _dropEmptyRows(table).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _arrowConvertOptions(columns=None, types=None):
+    import pyarrow.csv as pv
+
+    return pv.ConvertOptions(
+        include_columns=columns,
+        column_types={column: _arrowType(bq_type) for column, bq_type in (types or {}).items()},
+        # Treat empty text cells as missing, like pd.read_csv does.
+        strings_can_be_null=True,
+    )
+
+
+def _dropEmptyRows(table):
+    """
+    Drops the rows where every cell is empty while the data is still in
+    Arrow, so pandas never has to copy the frame to remove them.
+    """
+    import pyarrow.compute as pc
+
+    if not table.num_columns:
+        return table
+    empty = pc.is_null(table.column(0))
+    for column in table.columns[1:]:
+        empty = pc.and_(empty, pc.is_null(column))
+    return table.filter(pc.invert(empty))
+
+
+def leftCompact(df):
+    """
+    Shifts the values of each row to the left over its empty cells, for SIS
+    exports whose merged cells leave a row's values in different columns.
+    Returns a frame with columns 0, 1, 2, ... as wide as the fullest row;
+    shorter rows end in NaN. Same result as
+    df.apply(lambda x: pd.Series(x.dropna().values), axis=1), in one pass.
+    """
+    values = df.to_numpy(dtype=object)
+    missing = pd.isna(values)
+
+    # A stable sort of each row's null mask puts the filled cells first,
+    # still in their original order.
+    order = np.argsort(missing, axis=1, kind="stable")
+    compacted = np.take_along_axis(values, order, axis=1)
+    compacted[np.take_along_axis(missing, order, axis=1)] = np.nan
+
+    width = int((~missing).sum(axis=1).max()) if len(df) else 0
+    return pd.DataFrame(compacted[:, :width], index=df.index).infer_objects()
+
+
+def compileProjection(tableSchema, column_mappings=None, columns=None, compact=True):
+    """
+    Compiles a table's tableSchema and a script's column_mappings (export name
+    -> schema name, or COLUMN_NAMES position -> name) into one function that
+    shapes a cleaned frame for upload. Pass columns to upload only those
+    schema columns, in that order.
+
+    project(df, **values) builds the table's columns in one pass: each one is
+    taken from values (e.g. entryID=getEntryID()) or from df under its schema
+    or export name, INTEGER, FLOAT and STRING columns are cast to their type,
+    and a new frame of just those columns is returned in schema order. DATE,
+    TIME and BOOLEAN columns are passed through; each script cleans them its own way.
+
+    With compact, CATEGORY_COLUMNS become categoricals, FLOAT32_COLUMNS
+    float32 and integers int32 where they fit (see CATEGORY_COLUMNS).
+    """
+    sources = {}
+    for export_name, name in (column_mappings or {}).items():
+        sources.setdefault(name, []).append(export_name)
+
+    schema_types = {field["name"]: field["type"] for field in tableSchema}
+    plan = [
+        (name, [name, *sources.get(name, [])], _projectionCast(name, schema_types[name], compact))
+        for name in columns or schema_types
+    ]
+
+    def project(df, **values):
+        projected = {}
+        missing = []
+        for name, candidates, cast in plan:
+            if name in values:
+                column = values[name]
+            else:
+                source = next((candidate for candidate in candidates if candidate in df.columns), None)
+                if source is None:
+                    missing.append(name)
+                    continue
+                column = df[source]
+            if cast is not None:
+                if isinstance(column, pd.Series):
+                    column = cast(column)
+                elif not pd.api.types.is_scalar(column):
+                    column = cast(pd.Series(column, index=df.index))
+                elif compact:
+                    # Cast one value and repeat it, rather than casting the same value on every row.
+                    column = cast(pd.Series([column])).take(np.zeros(len(df), dtype=np.intp)).set_axis(df.index)
+                # Other single values are repeated down the column by the frame itself.
+            projected[name] = column
+
+        if missing:
+            raise KeyError(f"Missing columns for the table: {', '.join(missing)}")
+        return pd.DataFrame(projected, index=df.index, copy=False)
+
+    return project
+
+
+def _projectionCast(name, bq_type, compact):
+    """
+    Returns the function compileProjection casts a column with, or None.
+    """
+    cast = PROJECTION_CASTS.get(bq_type)
+    if cast is None or not compact:
+        return cast
+    if bq_type == "STRING" and name in CATEGORY_COLUMNS:
+        return lambda series: _castString(series).astype("category")
+    if bq_type == "FLOAT" and name in FLOAT32_COLUMNS:
+        return lambda series: _castFloat(series).astype("float32")
+    if bq_type == "INTEGER":
+        return lambda series: _downcastInteger(_castInteger(series))
+    return cast
+
+
+def _castInteger(series):
+    # Columns that are already integers (including Arrow ones) are kept as they are.
+    if pd.api.types.is_integer_dtype(series):
+        return series
+    try:
+        return series.astype("int64")
+    except (TypeError, ValueError):
+        # Missing ids and counts stay missing instead of failing the cast.
+        return series.astype("Int64")
+
+
+def _downcastInteger(series):
+    if series.dtype.itemsize <= 4:
+        return series
+    values = series.dropna()
+    if len(values) and not (np.iinfo(np.int32).min <= values.min() and values.max() <= np.iinfo(np.int32).max):
+        return series
+    return series.astype("Int32" if len(values) < len(series) else "int32")
+
+
+def _castFloat(series):
+    if pd.api.types.is_float_dtype(series):
+        return series
+    return series.astype("float64")
+
+
+def _castString(series):
+    if series.dtype == object:
+        if pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty"):
+            return series
+    elif pd.api.types.is_string_dtype(series):
+        return series
+    # Missing cells stay missing rather than becoming the text "nan".
+    return series.astype(str).where(series.notna(), None)
+
+
+# How compileProjection casts each BigQuery type.
+PROJECTION_CASTS = {
+    "INTEGER": _castInteger,
+    "FLOAT": _castFloat,
+    "STRING": _castString,
+}
+
+
+# The date helpers accept one value or a whole Series. Pass the Series: it is
+# parsed in one vectorized step (see _dateParsing) instead of row by row.
+
+def convertToStandardDate(date_str):
+    return _applyToValueOrSeries(_dateParsing.toStandardDate, date_str)
+
+def convertToStandardTime(time_str):
+    return _applyToValueOrSeries(_dateParsing.toStandardTime, time_str)
+
+def getSchoolYear(date):
+    return _applyToValueOrSeries(_dateParsing.schoolYear, date)
+
+
+def getSemester(date):
+    return _applyToValueOrSeries(_dateParsing.semester, date)
+
+
+def _applyToValueOrSeries(convert, value):
+    if isinstance(value, pd.Series):
+        return convert(value)
+    return convert(pd.Series([value], dtype=object)).iloc[0]
+
+
+if __name__ == "__main__":
+    # Provision tables from uploader scripts, e.g.
+    #   python3 scripts/_dataManager.py provision at_report_update half_day_report_update FOCUS_update
+    # Add --dry-run to see what would change without changing anything.
+    arguments = [argument for argument in sys.argv[1:] if not argument.startswith("--")]
+    if not arguments or arguments[0] != "provision" or len(arguments) < 2:
+        print(Fore.RED + "Usage: python3 scripts/_dataManager.py provision <script name> [<script name> ...] [--dry-run]")
+        sys.exit(1)
+
+    scripts_folder = os.path.dirname(os.path.abspath(__file__))
+    for script_name in arguments[1:]:
+        script_path = os.path.join(scripts_folder, script_name.removesuffix(".py") + ".py")
+        settings = readScriptSettings(script_path)
+        print(Fore.YELLOW + f"Provisioning {settings['dataset_id']}.{settings['table_id']} from {script_name}...")
+        provisionTable(
+            settings["tableSchema"], settings["project_id"], settings["dataset_id"], settings["table_id"],
+            partitionColumn=settings.get("partitionColumn"),
+        )
@@ -0,0 +1,132 @@
+"""
+Vectorized date and time parsing for the uploader scripts.
+
+Every function takes a whole pandas Series. Exports repeat the same few
+hundred dates across thousands of rows, so each distinct value is parsed
+once and the results are mapped back onto the rows.
+"""
+import pandas as pd
+from colorama import Fore
+
+# Two-digit years from 50 up are 19xx, below 50 are 20xx (e.g. 9/3/25 is 2025).
+TWO_DIGIT_YEAR_PIVOT = 50
+
+# Format of FOCUS swipe times, e.g. "2023-08-30 08:15:00".
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _parseUnique(series, parse):
+    """
+    Runs parse over the distinct non-null values of series and maps the
+    results back onto every row. Missing values stay missing.
+    """
+    codes, uniques = pd.factorize(series)
+    if not len(uniques):
+        return pd.Series(None, index=series.index, dtype=object)
+    parsed = parse(pd.Series(uniques, dtype=object))
+    result = parsed.take(codes.clip(min=0)).set_axis(series.index)
+    return result.where(codes >= 0)
+
+
+def _parseDateStrings(values):
+    # Aspen exports dates as M/D/YYYY or M/D/YY; anything else is tried as ISO (YYYY-MM-DD).
+    text = values.astype(str).str.strip()
+    parts = text.str.extract(r"^(\d{1,2})/(\d{1,2})/(\d{2}|\d{4})$").astype(float)
+    year = parts[2]
+    two_digit = year < 100
+    century = pd.Series(0, index=year.index).mask(two_digit, 2000).mask(two_digit & (year >= TWO_DIGIT_YEAR_PIVOT), 1900)
+    year = year + century
+    dates = pd.to_datetime(
+        pd.DataFrame({"year": year, "month": parts[0], "day": parts[1]}), errors="coerce"
+    )
+
+    iso = dates.isna()
+    if iso.any():
+        dates[iso] = pd.to_datetime(text[iso], format="%Y-%m-%d", errors="coerce")
+    return dates
+
+
+def parseDates(series):
+    """
+    Parses M/D/YYYY, M/D/YY or YYYY-MM-DD text into datetime64 values.
+    Values that are not dates become NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.normalize()
+    return _parseUnique(series, _parseDateStrings).astype("datetime64[ns]")
+
+
+def parseDateTimes(series, format=DATETIME_FORMAT):
+    """
+    Parses date-time text with an explicit format (FOCUS's by default).
+    Values in another ISO layout are parsed as ISO 8601; anything else becomes
+    NaT, with a warning giving how many non-blank values that was.
+
+    Swipe times are nearly all distinct, so unlike the other functions this
+    one parses every row rather than deduplicating first.
+    """
+    parsed = pd.to_datetime(series, format=format, errors="coerce")
+    other = parsed.isna() & series.notna()
+    if other.any():
+        text = series[other].astype(str).str.strip()
+        parsed[other] = pd.to_datetime(text, format="ISO8601", errors="coerce")
+        unreadable = (parsed[other].isna() & (text != "")).sum()
+        if unreadable:
+            name = f" in {series.name}" if series.name is not None else ""
+            print(Fore.YELLOW + f"{unreadable} date-times{name} could not be read and were left empty.")
+    return parsed
+
+
+def _asText(values, missing):
+    # strftime leaves NaN for missing values; use None so BigQuery gets NULL.
+    return values.astype(object).where(~missing, None)
+
+
+def _fromDates(series, convert):
+    """
+    Parses the distinct values of series as dates, runs convert over the
+    parsed dates and maps the text it returns back onto every row.
+    """
+    def parse(values):
+        dates = parseDates(values)
+        return _asText(convert(dates), dates.isna())
+
+    return _asText(_parseUnique(series, parse), series.isna())
+
+
+def toStandardDate(series):
+    """
+    Returns the dates as "YYYY-MM-DD" text (None where missing).
+    """
+    return _fromDates(series, lambda dates: dates.dt.strftime("%Y-%m-%d"))
+
+
+def toStandardTime(series):
+    """
+    Returns H:M:S times as zero-padded "HH:MM:SS" text (None where missing).
+    """
+    def parse(values):
+        parts = values.astype(str).str.strip().str.extract(r"^(\d{1,2}):(\d{1,2}):(\d{1,2})$")
+        return parts[0].str.zfill(2) + ":" + parts[1].str.zfill(2) + ":" + parts[2].str.zfill(2)
+
+    times = _parseUnique(series, parse)
+    return _asText(times, times.isna())
+
+
+def schoolYear(series):
+    """
+    Returns the school year of each date, e.g. "SY26" for 2025-09-03 and
+    2026-03-10. School years start in August.
+    """
+    def convert(dates):
+        year = (dates.dt.year + (dates.dt.month > 7)) % 100
+        return "SY" + year.astype("Int64").astype(str)
+
+    return _fromDates(series, convert)
+
+
+def semester(series):
+    """
+    Returns "S1" for dates from August to December and "S2" for January to July.
+    """
+    return _fromDates(series, lambda dates: pd.Series("S2", index=dates.index).mask(dates.dt.month > 7, "S1"))
@@ -0,0 +1,149 @@
+"""
+Vectorized number parsing for the uploader scripts.
+
+Every function takes a whole pandas Series of text as it comes out of an
+export and returns float64 values plus a malformed mask: True where a cell
+has something in it that is not a number. Blank cells are missing values,
+not malformed ones.
+
+Understood formats, in any combination: currency symbols ("$ 1,234.56"),
+thousands separators ("1,234"), signs ("-12.50", "$-12.50"), accounting
+negatives ("(12.50)", "$ (12.50)"), percents ("12.5%", kept as 12.5) and,
+for parseNumberAndLetter, a trailing letter grade ("93.5 A", "85 B+").
+"""
+import pandas as pd
+
+# Removed before matching, so "$ 1,234.56" and "93.5 A" need no spaces in the pattern.
+_IGNORED = r"[\s$€£]"
+
+# Splits a cell into its parts loosely; each part is then checked on its own.
+# Capture groups are slow even in Arrow's regex engine, so the pattern that
+# extracts them is kept simple and the stricter ones below only test for a match.
+_PARTS = r"^(?P<sign>[-+(]*)(?P<digits>[\d,.]+)%?(?P<close>\)?)(?P<letter>[A-Za-z]?[+-]?)$"
+
+# "-", "+", "(" or a sign and "(" together.
+_SIGNS = ["", "-", "+", "(", "-(", "+(", "(-", "(+"]
+_DIGITS = r"^(?:\d{1,3}(?:,\d{3})+(?:\.\d*)?|\d+(?:\.\d*)?|\.\d+)$"
+_LETTER = r"^(?:[A-Za-z][+-]?)?$"
+
+# Plain numbers or percents, signed or parenthesised, or blank: the common
+# shape of a numeric export column, which is parsed without splitting it into parts.
+_PLAIN_NUMBER = r"(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?%?"
+_PLAIN = rf"^(?:[-+]?{_PLAIN_NUMBER}|\({_PLAIN_NUMBER}\))?$"
+# Cells checked against _PLAIN before trying it on the whole column.
+_PLAIN_SAMPLE = 100
+# Leading cells counted to tell a column of mostly distinct values, which
+# dictionary encoding would not shrink, from one of repeated values.
+_DISTINCT_SAMPLE = 10_000
+
+
+def _arrowText(series):
+    import pyarrow as pa
+
+    try:
+        text = pa.array(series, type=pa.string(), from_pandas=True)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        # Mixed cells (e.g. numbers among the text): parse their text.
+        text = pa.array(series.astype(str).where(series.notna()), type=pa.string(), from_pandas=True)
+
+    # Arrow-backed Series hand over a chunked array.
+    return text.combine_chunks() if isinstance(text, pa.ChunkedArray) else text
+
+
+def _parse(series):
+    """
+    Parses every cell and returns the values, the trailing letters and the
+    malformed mask as Series. Exports repeat the same values many times, so
+    the cells are dictionary-encoded and each distinct one is parsed once;
+    mostly distinct columns of plain numbers skip the encoding.
+    """
+    import pyarrow.compute as pc
+
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype(float), pd.Series(None, index=series.index, dtype=object), pd.Series(False, index=series.index)
+
+    def toSeries(array):
+        return pd.Series(array.to_pandas().to_numpy(), index=series.index, name=series.name)
+
+    text = _arrowText(series)
+    sample = text[:_DISTINCT_SAMPLE]
+    if pc.count_distinct(sample).as_py() > len(sample) // 2:
+        numbers = _parsePlain(text)
+        if numbers is not None:
+            return toSeries(numbers), pd.Series(None, index=series.index, dtype=object), pd.Series(False, index=series.index)
+
+    encoded = pc.dictionary_encode(text)
+    parsed = [pc.take(array, encoded.indices) for array in _parseText(encoded.dictionary)]
+
+    numbers, letters, malformed = parsed
+    return toSeries(numbers).astype(float), toSeries(letters), toSeries(malformed.fill_null(False)).astype(bool)
+
+
+def _parsePlain(text):
+    """
+    Parses an Arrow array of strings in which every cell matches _PLAIN, or
+    returns None if any cell does not.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    for cells in (text[:_PLAIN_SAMPLE], text):
+        if not pc.all(pc.match_substring_regex(cells, _PLAIN)).as_py():
+            return None
+    opened = pc.starts_with(text, "(")
+    text = pc.replace_substring(pc.ascii_trim(text, "()%"), ",", "")
+    numbers = pc.cast(pc.if_else(pc.equal(text, ""), pa.scalar(None, pa.string()), text), pa.float64())
+    return pc.if_else(opened, pc.negate(numbers), numbers)
+
+
+def _parseText(text):
+    """
+    Matches an Arrow array of strings against _PARTS and returns Arrow arrays
+    of the values, the letters and the malformed flags. The regexes run in
+    Arrow rather than once per row in Python.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    text = pc.replace_substring_regex(text, _IGNORED, "")
+    parts = pc.extract_regex(text, _PARTS)
+    sign, digits, close, letter = (parts.field(name) for name in ("sign", "digits", "close", "letter"))
+
+    # Rows that did not match come back as null, with "" in every part.
+    opened = pc.match_substring(sign, "(")
+    matched = pc.is_valid(parts)
+    for check in (
+        pc.is_in(sign, value_set=pa.array(_SIGNS)),
+        pc.match_substring_regex(digits, _DIGITS),
+        pc.match_substring_regex(letter, _LETTER),
+        pc.equal(opened, pc.equal(close, ")")),
+    ):
+        matched = pc.and_(matched, check)
+    negative = pc.or_(opened, pc.match_substring(sign, "-"))
+
+    null = pa.scalar(None, pa.string())
+    numbers = pc.cast(pc.replace_substring(pc.if_else(matched, digits, null), ",", ""), pa.float64())
+    numbers = pc.if_else(negative, pc.negate(numbers), numbers)
+    letters = pc.if_else(pc.and_(matched, pc.not_equal(letter, "")), letter, null)
+    malformed = pc.and_(pc.invert(matched), pc.not_equal(text, ""))
+    return numbers, letters, malformed
+
+
+def parseNumbers(series):
+    """
+    Parses currency, thousands separators, signed and parenthesised
+    negatives and percents into float64 values. Returns (values, malformed);
+    malformed values (including ones with a trailing letter) become NaN.
+    """
+    values, letters, malformed = _parse(series)
+    lettered = letters.notna()
+    return values.mask(lettered), malformed | lettered
+
+
+def parseNumberAndLetter(series):
+    """
+    Parses "93.5 A"-style cells into their number and letter. Returns
+    (values, letters, malformed). A cell with only a number gets no letter;
+    a cell without a number (e.g. "A" alone) is malformed.
+    """
+    return _parse(series)
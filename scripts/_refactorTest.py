@@ -24,11 +24,10 @@ def cleanData(df):
     """
     print(Fore.CYAN + "Cleaning data...")
 
-    # if the balance column has ( ) around it, then convert to a negative number
-    df["balance"] = df["balance"].apply(lambda x: x.replace("(", "-").replace(")", "") if "(" in x else x)
-
-    # convert the balance column to float
-    df["balance"] = df["balance"].astype(float)
+    # convert the balance column to float; ( ) around a balance makes it negative
+    df["balance"], malformed = parseNumbers(df["balance"])
+    if malformed.any():
+        print(Fore.YELLOW + f"{malformed.sum()} balances could not be read and were left empty.")
 
     print(Fore.CYAN + "Data has been cleaned.")
     return df
@@ -40,8 +39,11 @@ def doWork():
     """
     print(Fore.YELLOW + f"Starting {scriptName} script...")
 
-    # Read in the first .csv file found
-    csv_file, rawDataFrame = readCSV(source_folder)
+    # Read in every .csv file found
+    csv_files, rawDataFrame = readCSV(source_folder)
+
+    if not csv_files:
+        return
 
     # Clean the data
     cleanedDataFrame = cleanData(rawDataFrame)
@@ -56,7 +58,7 @@ def doWork():
     uploadToBigQuery(cleanedDataFrame, tableSchema, project_id, dataset_id, table_id)
 
     # Archive the source file
-    archiveSourceFile(cleanedDataFrame, csv_file, source_folder, table_id)
+    archiveSourceFile(cleanedDataFrame, csv_files, source_folder, table_id)
 
 
     print(Fore.GREEN + f"{scriptName} data pull complete.")
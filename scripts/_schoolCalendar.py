@@ -0,0 +1,162 @@
+"""
+School calendar lookups: week label, school year, semester and whether a
+date is an instructional day, plus the grade <-> year of graduation mapping.
+
+Each school year's calendar is built once as a date-indexed table and
+joined onto frames with a single vectorized lookup (see calendarColumns).
+
+School years run from August 1 to July 31 and are named for the year they
+end in (2025-09-03 is in SY26). The first day of school, the start of the
+second semester, the last day and the days off come from
+../dataUploaders/schoolCalendar.json when the year is listed there, e.g.
+
+    {
+        "SY26": {
+            "firstDay": "2025-08-18",
+            "semester2": "2026-01-20",
+            "lastDay": "2026-06-05",
+            "noSchool": ["2025-09-01", "2025-11-27", "2025-11-28"]
+        }
+    }
+
+Any value left out falls back to DEFAULT_* below.
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+import json
+import os
+
+import pandas as pd
+from colorama import Fore
+
+from _dateParsing import parseDates
+
+CALENDAR_FILE = "../dataUploaders/schoolCalendar.json"
+
+# Used for school years (or values) missing from CALENDAR_FILE: school starts
+# on the first Monday on or after August 15, the second semester starts on
+# January 1 (as getSemester assumes) and the last day is June 15.
+DEFAULT_FIRST_DAY = (8, 15)
+DEFAULT_SEMESTER_2 = (1, 1)
+DEFAULT_LAST_DAY = (6, 15)
+
+# Students graduate in the spring of their grade 12 year.
+LAST_GRADE = 12
+
+
+def schoolYearLabel(end_year):
+    return f"SY{end_year % 100}"
+
+
+def _endYear(sy):
+    # "SY26" -> 2026
+    return 2000 + int(str(sy).upper().removeprefix("SY"))
+
+
+@lru_cache(maxsize=None)
+def _calendarSettings():
+    if not os.path.exists(CALENDAR_FILE):
+        return {}
+    with open(CALENDAR_FILE) as file:
+        return {sy.upper(): settings for sy, settings in json.load(file).items()}
+
+
+@lru_cache(maxsize=None)
+def calendarTable(sy):
+    """
+    Returns the calendar of one school year ("SY26") as a DataFrame indexed by
+    date from August 1 to July 31, with week ("W01", ... or None outside the
+    school year's weeks), sy, semester and instructional columns.
+    Weeks run Monday to Sunday, and W01 is the week of the first day of school.
+    """
+    end_year = _endYear(sy)
+    settings = _calendarSettings().get(schoolYearLabel(end_year), {})
+
+    first_day = pd.Timestamp(settings.get("firstDay") or date(end_year - 1, *DEFAULT_FIRST_DAY))
+    if "firstDay" not in settings:
+        first_day += timedelta(days=(7 - first_day.weekday()) % 7)
+    semester_2 = pd.Timestamp(settings.get("semester2") or date(end_year, *DEFAULT_SEMESTER_2))
+    last_day = pd.Timestamp(settings.get("lastDay") or date(end_year, *DEFAULT_LAST_DAY))
+    no_school = pd.DatetimeIndex(pd.to_datetime(settings.get("noSchool", [])))
+
+    days = pd.date_range(date(end_year - 1, 8, 1), date(end_year, 7, 31), freq="D")
+    first_monday = first_day - timedelta(days=first_day.weekday())
+    week_number = (days - first_monday).days // 7 + 1
+    in_weeks = (days >= first_monday) & (days <= last_day)
+
+    table = pd.DataFrame(index=days)
+    table["week"] = pd.Series([f"W{n:02d}" for n in week_number], index=days).where(in_weeks, None)
+    table["sy"] = schoolYearLabel(end_year)
+    table["semester"] = pd.Series("S1", index=days).mask(days >= semester_2, "S2")
+    table["instructional"] = (
+        (days >= first_day) & (days <= last_day) & (days.weekday < 5) & ~days.isin(no_school)
+    )
+    return table
+
+
+def calendarColumns(dates, columns=("week", "sy", "semester", "instructional")):
+    """
+    Looks up the calendar columns for a Series of dates (text or datetime)
+    and returns them as a DataFrame aligned with the Series.
+    """
+    parsed = parseDates(dates)
+    end_years = (parsed.dt.year + (parsed.dt.month > 7)).dropna().unique()
+    if not len(end_years):
+        return pd.DataFrame(None, index=dates.index, columns=list(columns))
+
+    table = pd.concat([calendarTable(schoolYearLabel(int(year))) for year in sorted(end_years)])
+    return table[list(columns)].reindex(parsed.to_numpy()).set_axis(dates.index)
+
+
+def currentSchoolYear(today=None):
+    """
+    Returns the school year of today (or the given date), e.g. "SY26".
+    """
+    today = pd.Timestamp(today or date.today())
+    return schoolYearLabel(today.year + (today.month > 7))
+
+
+def currentWeek(today=None):
+    """
+    Returns the week label of today (or the given date), e.g. "W07", or None
+    outside the school year's weeks.
+    """
+    today = pd.Timestamp(today or date.today()).normalize()
+    return calendarTable(currentSchoolYear(today)).at[today, "week"]
+
+
+def getWeek(default=None):
+    """
+    Asks for the week label of an upload, suggesting default (this week's by
+    default); pressing Enter accepts the suggestion.
+    """
+    default = default or currentWeek()
+    if default is None:
+        return input(Fore.CYAN + "Enter the week for this roster (W01, W02, ...): ")
+    week = input(Fore.CYAN + f"Enter the week for this roster (W01, W02, ...) or press Enter for {default}: ")
+    return week.strip() or default
+
+
+def gradeToYOG(grades, sy=None):
+    """
+    Returns the year of graduation for each grade in the given school year
+    (this school year by default): in SY26, grade 12 -> 2026 and grade 9 -> 2029.
+    sy may be one label or a Series of them (e.g. calendarColumns(...)["sy"]).
+    """
+    end_years = _endYears(sy, grades.index)
+    return (end_years + LAST_GRADE - pd.to_numeric(grades, errors="coerce")).astype("Int64")
+
+
+def yogToGrade(yogs, sy=None):
+    """
+    Returns the grade of each year of graduation in the given school year
+    (this school year by default); the reverse of gradeToYOG.
+    """
+    end_years = _endYears(sy, yogs.index)
+    return (end_years + LAST_GRADE - pd.to_numeric(yogs, errors="coerce")).astype("Int64")
+
+
+def _endYears(sy, index):
+    if isinstance(sy, pd.Series):
+        return 2000 + pd.to_numeric(sy.astype(str).str.upper().str.removeprefix("SY"), errors="coerce")
+    return pd.Series(_endYear(sy or currentSchoolYear()), index=index)
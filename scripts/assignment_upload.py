@@ -47,6 +47,8 @@ COLUMN_MAPPINGS = {
     11: "num_grades",
 }
 
+projectColumns = compileProjection(schema, COLUMN_MAPPINGS)
+
 # Get the entry ID from the user
 def getEntryID():
     # entryID = input(Fore.CYAN + "Enter the entry ID for this roster YYYYMMDDX: ")
@@ -68,19 +70,12 @@ def getTerm():
     return "-"
 
 
-def prepareCSVFile(source_folder):
-    # open and delete the first row of the first csv file found in the source folder
-    for file in os.listdir(source_folder):
-        if file.endswith(".csv"):
-            file_path = os.path.join(source_folder, file)
-            with open(file_path, 'r') as f:
-                lines = f.readlines()
-            with open(file_path, 'w') as f:
-                f.writelines(lines[1:])  # write all lines except the first
-            print(Fore.GREEN + f"Prepared CSV file: {file}")
-            return file_path
-    print(Fore.RED + "No CSV files found in the source folder.")
-    return None
+def prepareCSVFile(csv_path):
+    # open the csv file past its first row (a title line), leaving the file itself as it is
+    file = open(csv_path, "rb")
+    file.readline()
+    print(Fore.GREEN + f"Prepared CSV file: {os.path.basename(csv_path)}")
+    return file
 
 def cleanData(df):
     entryID = getEntryID()
@@ -88,16 +83,13 @@ def cleanData(df):
     print("Cleaning data...")
 
     # delete all empty cells, and shift all cells to the left if there are any empty cells
-    df = df.apply(lambda x: pd.Series(x.dropna().values), axis=1)
+    df = leftCompact(df)
     df = df.dropna(axis=1, how='all')  # drop any columns that are completely empty
     df = df.reset_index(drop=True)  # reset the index after dropping rows/columns
 
     # delete all rows where the first column contains "Totals"
     df = df[~df[0].str.contains("Totals", case=False, na=False)]
 
-    # Rename columns based on predefined mappings
-    df.rename(columns=COLUMN_MAPPINGS, inplace=True, errors="raise")
-    
     # go through the period column, and if it's a 1, then "01(Reg)", if it's a 2, then "02", if it's a 3, then "03", if it's a 4, then "04", if it's a 5, then "05", if it's a 6, then "06", if it's a 7, then "07", if it's an 8, then "08", if it's a 9, then "09", if it's a 10, then "10", if it's an 11, then "11", if it's a 12, then "12". If it's already in that format, leave it alone.
     period_mapping = {
         "01": "01(Reg)",
@@ -111,28 +103,11 @@ def cleanData(df):
         "Lu": "Lunch/Adv(Reg)",
         "Ad": "Adv/Lunch(Reg)"
     }   
-    df["period"] = df["period"].map(period_mapping).fillna(df["period"])
-    # If there are any columns not in the mapping, drop them
-    df = df.reset_index(drop=True)  # reset the index after dropping rows/columns
+    period = df[2].map(period_mapping).fillna(df[2])
 
-    # Add 'entryID' and term columns
-    df['entryID'] = entryID
-    df['term'] = getTerm()
-
-    # ensure all data types are correct
-    df["entryID"] = df["entryID"].astype(int)
-    df["teacher"] = df["teacher"].astype(str)
-    df["class"] = df["class"].astype(str)
-    df["period"] = df["period"].astype(str)
-    df["assignment"] = df["assignment"].astype(str)
-    df["num_A"] = df["num_A"].astype(int)
-    df["num_B"] = df["num_B"].astype(int)
-    df["num_C"] = df["num_C"].astype(int)
-    df["num_D"] = df["num_D"].astype(int)
-    df["num_F"] = df["num_F"].astype(int)
-    df["num_blank"] = df["num_blank"].astype(int)
-    df["special_codes"] = df["special_codes"].astype(int)
-    df["num_grades"] = df["num_grades"].astype(int)
+    # Rename, add entryID and term, cast and order the columns in one pass
+    df = projectColumns(df, entryID=entryID, term=getTerm(), period=period)
+    df = df.reset_index(drop=True)  # reset the index after dropping rows
 
     return df
 
@@ -143,10 +118,11 @@ def doWork():
     """
     print(Fore.YELLOW + f"Starting {scriptName} script...")
 
-    prepareCSVFile(source_folder)
+    # Read in every .csv file found, skipping each one's first row
+    csv_files, rawDataFrame = readCSV(source_folder, prepare=prepareCSVFile)
 
-    # Read in the first .csv file found
-    csv_file, rawDataFrame = readCSV(source_folder)
+    if not csv_files:
+        return
 
     # Clean the data
     cleanedDataFrame = cleanData(rawDataFrame)
@@ -155,7 +131,7 @@ def doWork():
     uploadToBigQuery(cleanedDataFrame, schema, project_id, dataset_id, table_id)
 
     # Archive the source file
-    archiveSourceFile(cleanedDataFrame, csv_file, source_folder, table_id)
+    archiveSourceFile(cleanedDataFrame, csv_files, source_folder, table_id)
 
     print(Fore.GREEN + f"{scriptName} data pull complete.")
 
@@ -28,6 +28,14 @@ tableSchema = [
     {"name": "semester", "type": "STRING"},
 ]
 
+# The table is partitioned by day on this column; provisioning sets it up.
+partitionColumn = "date"
+
+# Uploads overwrite the report's days in the date-partitioned table. If the
+# table is not partitioned yet, they merge on the columns that identify one
+# attendance entry instead.
+mergeKeys = ["id", "date", "period", "code"]
+
 
 # Define the column name mappings
 column_mappings = {
@@ -44,6 +52,8 @@ column_mappings = {
     "entryID": "entryID",
 }
 
+projectColumns = compileProjection(tableSchema, column_mappings)
+
 # Get the entry ID from the user
 def getEntryID():
     # entryID = input(Fore.CYAN + "Enter the entry ID for this roster YYYYMMDDX: ")
@@ -65,19 +75,13 @@ def cleanData(df):
     """
     print(Fore.RESET + "Processing data...")
 
-    # Create entryID
-    df["entryID"] = getEntryID()
-
-    # Rename columns
-    df.rename(columns=column_mappings, inplace=True)
-
-    # drop columns yog tardy, absent
-    df.drop(columns=["yog", "tardy", "absent"], inplace=True)
-
     # Convert date and derive related columns
-    df["date"] = df["date"].apply(convertToStandardDate)
-    df["sy"] = df["date"].apply(getSchoolYear)
-    df["semester"] = df["date"].apply(getSemester)
+    date = convertToStandardDate(df["Date"])
+    calendar = calendarColumns(date, ["sy", "semester"])
+
+    # Rename, add entryID, cast and order the columns in one pass; the yog,
+    # tardy and absent columns are left out
+    df = projectColumns(df, entryID=getEntryID(), date=date, sy=calendar["sy"], semester=calendar["semester"])
 
     return df
 
@@ -88,26 +92,33 @@ def doWork():
     """
     print(Fore.YELLOW + f"Starting {scriptName} script...")
 
-    # Read in the first .csv file found
-    csv_file, rawDataFrame = readCSV(source_folder)
+    if shouldStream(source_folder):
+        # Too large to hold at once: clean it a chunk at a time into a spool on disk
+        csv_files, cleanedData = spoolCSV(source_folder, cleanData, tableSchema, column_mappings=column_mappings)
+    else:
+        # Read in every .csv file found
+        csv_files, rawDataFrame = readCSV(source_folder, column_mappings=column_mappings, tableSchema=tableSchema)
 
-    # Clean the data
-    cleanedDataFrame = cleanData(rawDataFrame)
+        if not csv_files:
+            return
 
-    # purge the table
-    deleteDataBetweenDates(
+        # Clean the data
+        cleanedData = cleanData(rawDataFrame)
+
+    # Replace the report's date range in BigQuery
+    uploadToBigQuery(
+        cleanedData,
+        tableSchema,
         project_id,
         dataset_id,
         table_id,
-        cleanedDataFrame["date"].min(),
-        cleanedDataFrame["date"].max(),
+        mode="partitions",
+        keyColumns=mergeKeys,
+        scopeColumn=partitionColumn,
     )
 
-    # Upload the data to BigQuery
-    uploadToBigQuery(cleanedDataFrame, tableSchema, project_id, dataset_id, table_id)
-
     # Archive the source file
-    archiveSourceFile(cleanedDataFrame, csv_file, source_folder, table_id)
+    archiveSourceFile(cleanedData, csv_files, source_folder, table_id)
 
     print(Fore.GREEN + f"{scriptName} data pull complete.")
 
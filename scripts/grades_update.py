@@ -1,4 +1,5 @@
 from _dataManager import *
+from _schoolCalendar import getWeek
 from datetime import date
 
 
@@ -39,6 +40,12 @@ COLUMN_NAMES = [
     "move"
 ]
 
+# The columns cleanData uploads, in order
+projectColumns = compileProjection(
+    tableSchema,
+    columns=["entryID", "week", "sy", "id", "name", "course", "gradePercent", "letterGrade"],
+)
+
 # Get the entry ID from the user
 def getEntryID():
     # entryID = input(Fore.CYAN + "Enter the entry ID for this roster YYYYMMDDX: ")
@@ -50,10 +57,6 @@ def getEntryID():
 
     return int(entryID)
 
-def getWeek():
-    return input(Fore.CYAN + "Enter the week for this roster (W01, W02, ...): ")
-
-
 
 def cleanData(df):
     """
@@ -67,9 +70,7 @@ def cleanData(df):
     # change the column names
     df.columns = COLUMN_NAMES
 
-    # without deleting any data in averageAndLetter, move all data in the move column into averageAndLetter
-    df["averageAndLetter"] = df["averageAndLetter"].fillna(df["move"])
-    df["move"] = None
+    # prepareCSVFile has already moved the grades in the move column into averageAndLetter
 
     week_number = getWeek()
 
@@ -78,80 +79,57 @@ def cleanData(df):
     df.dropna(subset=["id"], inplace=True)
 
 
-    df[["gradePercent", "letterGrade"]] = df["averageAndLetter"].str.split(expand=True)
-    df.drop(columns=["averageAndLetter"], inplace=True)
+    gradePercent, letterGrade, malformed = parseNumberAndLetter(df["averageAndLetter"])
+    if malformed.any():
+        print(Fore.YELLOW + f"{malformed.sum()} grades could not be read and were left empty.")
 
-    sy = "SY26"
-    df["sy"] = f"{sy}"
-
-    df["entryID"] = getEntryID()
-
-    df["week"] = f"{week_number}"
-    df["id"] = df["id"].astype(int)
-    df["gradePercent"] = df["gradePercent"].astype(float)
-    df = df[
-        [
-            "entryID",
-            "week",
-            "sy",
-            "id",
-            "name",
-            "course",
-            "gradePercent",
-            "letterGrade"
-        ]
-    ]
+    # Add sy, entryID and week, cast and order the uploaded columns in one pass
+    df = projectColumns(
+        df,
+        sy=currentSchoolYear(),
+        entryID=getEntryID(),
+        week=f"{week_number}",
+        gradePercent=gradePercent,
+        letterGrade=letterGrade,
+    )
 
     print(Fore.RESET + "Merging data...")
     return df
 
-def find_csv_file(folder_path):
+def prepareCSVFile(csv_path):
     """
-    Finds the first .csv file in the given folder path.
-    Returns the file path if found, otherwise returns None.
+    Reads a grades export with a real CSV parser (so quoted names with commas
+    stay in one cell) and lines up its shifted columns. Returns the DataFrame;
+    the file itself is left as it is.
     """
-    for file in os.listdir(folder_path):
-        if file.endswith(".csv"):
-            return os.path.join(folder_path, file)
-    return None
-
-
-def prepareCSVFile(source_folder):
-
-    csv_path = find_csv_file(source_folder)
-    # open the file and add headers col1, col2, col3.... to col11
-    with open(csv_path, "r") as file:
-        data = file.readlines()
-
-    # look in the indexed 10th column until you find the first non-empty value. Look through the next rows of that column until you find the first empty value. Shift all of that data into the 9th column, starting at the same row as the first non-empty value. Then delete all data in the 10th column.
-    for i in range(len(data)):
-        row = data[i].strip().split(",")
-        if len(row) > 9 and row[9].strip() != "":
-            # Found the first non-empty value in the 10th column
-            for j in range(i, len(data)):
-                next_row = data[j].strip().split(",")
-                if len(next_row) > 9 and next_row[9].strip() == "":
-                    # Found the first empty value in the 10th column, stop shifting
-                    break
-                # Shift the value from the 10th column to the 9th column
-                if len(next_row) > 8:
-                    next_row[8] = next_row[9]
-                else:
-                    # If there are not enough columns, add empty columns until we can shift
-                    while len(next_row) <= 8:
-                        next_row.append("")
-                    next_row[8] = next_row[9]
-                # Clear the value in the 10th column
-                if len(next_row) > 9:
-                    next_row[9] = ""
-                data[j] = ",".join(next_row) + "\n"
-            break
-
-    headers = [f"col{i}" for i in range(1, 12)]
-    data.insert(0, ",".join(headers) + "\n")
-
-    with open(csv_path, "w") as file:
-        file.writelines(data)
+    # The export has no header row we can use, so name the columns ourselves
+    df = pd.read_csv(csv_path, header=None, names=COLUMN_NAMES, index_col=False)
+    return realignColumns(df)
+
+
+def realignColumns(df):
+    """
+    The first run of rows with a value in averageAndLetter has its cells one
+    column to the right: move those values back into drop4 and clear them.
+    Then grades that landed in the move column fill averageAndLetter.
+    """
+    grades = df["averageAndLetter"]
+
+    # Blank cells are already NaN; only the few filled ones need checking for whitespace
+    filled = grades.notna().to_numpy()
+    filled[filled] = grades[filled].astype(str).str.strip().ne("").to_numpy()
+
+    shifted = np.zeros(len(df), dtype=bool)
+    if filled.any():
+        start = filled.argmax()
+        gaps = ~filled[start:]
+        stop = start + (gaps.argmax() if gaps.any() else len(gaps))
+        shifted[start:stop] = True
+
+    df["drop4"] = df["drop4"].mask(shifted, grades)
+    df["averageAndLetter"] = grades.mask(shifted).fillna(df["move"])
+    df["move"] = None
+    return df
 
 def doWork():
     """
@@ -159,10 +137,11 @@ def doWork():
     """
     print(Fore.YELLOW + f"Starting {scriptName} script...")
 
-    prepareCSVFile(source_folder)
+    # Read in every .csv file found, fixing each one up in memory first
+    csv_files, rawDataFrame = readCSV(source_folder, prepare=prepareCSVFile)
 
-    # Read in the first .csv file found
-    csv_file, rawDataFrame = readCSV(source_folder)
+    if not csv_files:
+        return
 
     # Clean the data
     cleanedDataFrame = cleanData(rawDataFrame)
@@ -171,10 +150,11 @@ def doWork():
     uploadToBigQuery(cleanedDataFrame, tableSchema, project_id, dataset_id, table_id)
 
     # Archive the source file
-    archiveSourceFile(cleanedDataFrame, csv_file, source_folder, table_id)
+    archiveSourceFile(cleanedDataFrame, csv_files, source_folder, table_id)
 
 
     print(Fore.GREEN + f"{scriptName} data pull complete.")
 
 
-doWork()
+if __name__ == "__main__":
+    doWork()
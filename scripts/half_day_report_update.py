@@ -1,4 +1,5 @@
 from _dataManager import *
+from _schoolCalendar import getWeek
 
 
 scriptName = "half_day_report_update"
@@ -22,6 +23,14 @@ tableSchema = [
     {"name": "percentAbs", "type": "FLOAT"},
 ]
 
+# The table is partitioned by day on this column; provisioning sets it up.
+partitionColumn = "date"
+
+# Uploads overwrite the report's days in the date-partitioned table. If the
+# table is not partitioned yet, they merge on the columns that identify one
+# half-day entry instead.
+mergeKeys = ["id", "date", "code"]
+
 COLUMN_MAPPINGS = {
     "Date": "date",
     "Student > Name": "name",
@@ -36,6 +45,8 @@ COLUMN_MAPPINGS = {
     "Other": "other", 
 }
 
+projectColumns = compileProjection(tableSchema, COLUMN_MAPPINGS)
+
 
 
 # Get the entry ID from the user
@@ -49,47 +60,28 @@ def getEntryID():
 
     return int(entryID)
 
-def getWeek():
-    return input(Fore.CYAN + "Enter the week for this roster (W01, W02, ...): ")
-
 
 def cleanData(df):
     entryID = getEntryID()
-    week = getWeek()
+    calendar = calendarColumns(df["Date"], ["week", "sy"])
+    week = getWeek(calendar["week"].mode().iloc[0] if calendar["week"].notna().any() else None)
 
     print("Cleaning data...")
 
     # Columns are named Date	Student > Name	Student > Grade	Student ID	Code	Time	Absent?	Tardy?	Excused?	PcntAbs	Other
-    # Rename columns based on the mappings
-    df.rename(columns=COLUMN_MAPPINGS, inplace=True)
-    
-    # get the year of graduation from the grade column and put it in a new column 'yog'. Then drop the grade column. Do this by mapping: 9 -> 2029, 10 -> 2028, 11 -> 2027, 12 -> 2026
-    grade_to_yog = {
-        9: 2029,
-        10: 2028,
-        11: 2027,
-        12: 2026
-    }
-    df["yog"] = df["grade"].map(grade_to_yog)
-    df.drop(columns=["grade"], inplace=True, errors="ignore")
-
-    # Drop time, absent, tardy, other columns
-    df.drop(columns=["time", "absent", "tardy", "other"], inplace=True, errors="ignore")
-
-    # Add 'entryID' and 'week' columns
-    df['entryID'] = entryID
-    df['week'] = week
-
-    # ensure all data types are correct
-    df["entryID"] = df["entryID"].astype(int)
-    df['week'] = df['week'].astype(str)
-    df["date"] = df["date"].apply(convertToStandardDate)
-    df["name"] = df["name"].astype(str)
-    df["id"] = df["id"].astype(int)
-    df["yog"] = df["yog"].astype(int)
-    df["code"] = df["code"].astype(str)
-    df["excused"] = df["excused"].astype(bool)
-    df["percentAbs"] = df["percentAbs"].astype(float)
+    # get the year of graduation from the grade column and put it in a new column 'yog'. The school year of each row's date decides the mapping (in SY26, 9 -> 2029 ... 12 -> 2026)
+    yog = gradeToYOG(df["Student > Grade"], calendar["sy"])
+
+    # Rename, add entryID, week and yog, cast and order the columns in one
+    # pass; the grade, time, absent, tardy and other columns are left out
+    df = projectColumns(
+        df,
+        entryID=entryID,
+        week=str(week),
+        date=convertToStandardDate(df["Date"]),
+        yog=yog,
+        excused=df["Excused?"].astype(bool),
+    )
 
     return df
 
@@ -100,22 +92,29 @@ def doWork():
     """
     print(Fore.YELLOW + f"Starting {scriptName} script...")
 
-    # Read in the first .csv file found
-    csv_file, rawDataFrame = readCSV(source_folder)
+    # Read in every .csv file found
+    csv_files, rawDataFrame = readCSV(source_folder, column_mappings=COLUMN_MAPPINGS, tableSchema=tableSchema)
+
+    if not csv_files:
+        return
 
     # Clean the data
     cleanedDataFrame = cleanData(rawDataFrame)
 
-    min_date, max_date = cleanedDataFrame["date"].min(), cleanedDataFrame["date"].max()
-
-    deleteDataBetweenDates(project_id, dataset_id, table_id, min_date, max_date)
-    # deleteAllDataFromTable(project_id, dataset_id, table_id)
-
-    # Upload the data to BigQuery
-    uploadToBigQuery(cleanedDataFrame, tableSchema, project_id, dataset_id, table_id)
+    # Replace the report's date range in BigQuery
+    uploadToBigQuery(
+        cleanedDataFrame,
+        tableSchema,
+        project_id,
+        dataset_id,
+        table_id,
+        mode="partitions",
+        keyColumns=mergeKeys,
+        scopeColumn=partitionColumn,
+    )
 
     # Archive the source file
-    archiveSourceFile(cleanedDataFrame, csv_file, source_folder, table_id)
+    archiveSourceFile(cleanedDataFrame, csv_files, source_folder, table_id)
 
     print(Fore.GREEN + f"{scriptName} data pull complete.")
 
@@ -4,6 +4,7 @@ import pandas_gbq
 from google.cloud import bigquery
 from datetime import datetime
 from tqdm import tqdm
+from _dataManager import compileProjection
 
 # Define your GCP project ID and BigQuery dataset ID
 project_id = "chitechdb"
@@ -14,6 +15,15 @@ table_id = "student_info.allStudents"
 source_folder = "../dataUploaders/allStudents"
 destination_folder = "../dataUploaders/archivedFiles"
 
+tableSchema = [
+    {"name": "name", "type": "STRING"},
+    {"name": "id", "type": "INTEGER"},
+    {"name": "dob", "type": "DATE"},
+    {"name": "enrollment", "type": "STRING"},
+    {"name": "yog", "type": "INTEGER"},
+    {"name": "graduationDate", "type": "DATE"},
+]
+
 # Define the column name mappings
 column_mappings = {
     "Name": "name",
@@ -25,28 +35,13 @@ column_mappings = {
 }
 
 
+projectColumns = compileProjection(tableSchema, column_mappings)
+
+
 def cleanData(df):
-    df = df.drop(df.columns[16], axis=1)
-    df = df.drop(df.columns[14], axis=1)
-    df = df.drop(df.columns[13], axis=1)
-    df = df.drop(df.columns[10], axis=1)
-    df = df.drop(df.columns[9], axis=1)
-    df = df.drop(df.columns[8], axis=1)
-    df = df.drop(df.columns[7], axis=1)
-    df = df.drop(df.columns[6], axis=1)
-    df = df.drop(df.columns[4], axis=1)
-    df = df.drop(df.columns[3], axis=1)
-    df = df.drop(df.columns[2], axis=1)
-
-    # Rename the columns that exist in the DataFrame and are specified in column_mappings
-    for old_col, new_col in column_mappings.items():
-        if old_col in df.columns:
-            df.rename(columns={old_col: new_col}, inplace=True)
-
-    df["name"] = df["name"].astype(str)
-    df["id"] = df["id"].astype(int)
-    df["yog"] = df["yog"].astype(int)
-    df["enrollment"] = df["enrollment"].astype(str)
+    # Keep, rename and cast only the mapped columns of the export
+    df = projectColumns(df)
+
     df["dob"] = df["dob"].apply(convert_to_standard_date)
     df["graduationDate"] = df["graduationDate"].apply(convert_to_standard_date)
     return df
@@ -87,14 +82,7 @@ def uploadToBigQuery(df):
         destination_table=table_id,
         project_id=project_id,
         if_exists="replace",
-        table_schema=[
-            {"name": "name", "type": "STRING"},
-            {"name": "id", "type": "INTEGER"},
-            {"name": "dob", "type": "DATE"},
-            {"name": "enrollment", "type": "STRING"},
-            {"name": "yog", "type": "INTEGER"},
-            {"name": "graduationDate", "type": "DATE"},
-        ],
+        table_schema=tableSchema,
         progress_bar=True,
     )
 
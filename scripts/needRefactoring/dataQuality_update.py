@@ -55,13 +55,11 @@ def cleanData(df):
         if old_col in df.columns and new_col not in df.columns:
             df.rename(columns={old_col: new_col}, inplace=True)
 
-    df["percentError"] = (
-        df["percentError"].str.rstrip("%").astype(float)
-    )  # Clean percentError column
-
-    df["weight"] = (
-        df["weight"].str.rstrip("%").astype(int)
-    )  # Clean and convert Weight column
+    # Clean the percentError and weight columns ("12.5%" -> 12.5)
+    for column in ["percentError", "weight"]:
+        df[column], malformed = parseNumbers(df[column])
+        if malformed.any():
+            print(Fore.YELLOW + f"{malformed.sum()} {column} values could not be read and were left empty.")
 
     # Add custom rows with user-specified values
     custom_rows = {
@@ -86,8 +84,11 @@ def doWork():
     """
     print(Fore.YELLOW + f"Starting {scriptName} script...")
 
-    # Read in the first .csv file found
-    csv_file, rawDataFrame = readCSV(source_folder)
+    # Read in every .csv file found
+    csv_files, rawDataFrame = readCSV(source_folder)
+
+    if not csv_files:
+        return
 
     # Clean the data
     cleanedDataFrame = cleanData(rawDataFrame)
@@ -96,7 +97,7 @@ def doWork():
     uploadToBigQuery(cleanedDataFrame, tableSchema, project_id, dataset_id, table_id)
 
     # Archive the source file
-    archiveSourceFile(cleanedDataFrame, csv_file, source_folder, table_id)
+    archiveSourceFile(cleanedDataFrame, csv_files, source_folder, table_id)
 
     print(Fore.GREEN + f"{scriptName} data pull complete.")
 
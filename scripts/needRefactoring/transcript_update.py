@@ -1,10 +1,11 @@
 import os
 import pandas as pd
 import pandas_gbq
-from google.cloud import bigquery
 from datetime import datetime
 import re
 
+from _dataManager import getSession, fetchTableFromBigQuery, sqlList
+
 # Constants
 project_id = "chitechdb"
 table_id = "academics.transcripts"
@@ -68,17 +69,26 @@ def update_term_column(df):
 # Adjusted function to fetch course data
 def fetch_course_data(course_codes):
     """
-    Queries BigQuery for course details based on a list of course codes.
+    Reads course details for a list of course codes from the course catalog.
     Returns a DataFrame.
     """
-    client = bigquery.Client(project=project_id)
-    query = f"""
-    SELECT Title, S1_Course_Number, S2_Course_Number, Credit_Earned_1, Credit_Earned_2, 
-           Credit_Earned_3, Credit_Earned_4, Credit_Earned_5
-    FROM `chitechdb.logistics.cps_course_catalog` 
-    WHERE S1_Course_Number IN {tuple(course_codes)} OR S2_Course_Number IN {tuple(course_codes)}
-    """
-    course_df = client.query(query).to_dataframe()
+    codes = sqlList([str(code) for code in course_codes])
+    course_df = fetchTableFromBigQuery(
+        project_id,
+        "logistics",
+        "cps_course_catalog",
+        columns=[
+            "Title",
+            "S1_Course_Number",
+            "S2_Course_Number",
+            "Credit_Earned_1",
+            "Credit_Earned_2",
+            "Credit_Earned_3",
+            "Credit_Earned_4",
+            "Credit_Earned_5",
+        ],
+        rowFilter=f"S1_Course_Number IN {codes} OR S2_Course_Number IN {codes}",
+    )
     return course_df
 
 
@@ -165,12 +175,17 @@ def clean_data(df):
 
 def fetch_roster_data(ids):
     """
-    Queries BigQuery for the name and YOG based on a list of IDs.
+    Reads the name and YOG for a list of IDs from the roster.
     Returns a DataFrame.
     """
-    client = bigquery.Client(project=project_id)
-    query = f"SELECT id, name, yog FROM `{roster_table_id}` WHERE id IN {tuple(ids)}"
-    roster_df = client.query(query).to_dataframe()
+    dataset, table = roster_table_id.split(".")
+    roster_df = fetchTableFromBigQuery(
+        project_id,
+        dataset,
+        table,
+        columns=["id", "name", "yog"],
+        rowFilter=f"id IN {sqlList([int(i) for i in ids])}",
+    )
     return roster_df
 
 
@@ -179,9 +194,8 @@ def delete_all_data_from_table():
     Deletes all data from the specified BigQuery table.
     """
     print("Deleting old data from database to override...")
-    client = bigquery.Client(project=project_id)
     query = f"DELETE FROM `{table_id}` WHERE TRUE"
-    client.query(query).result()  # Execute the DELETE query
+    getSession(project_id).query(query)  # Execute the DELETE query
     print(f"All data from {table_id} has been deleted.")
 
 
@@ -225,6 +239,7 @@ def upload_to_big_query(df):
         df,
         destination_table=table_id,
         project_id=project_id,
+        bigquery_client=getSession(project_id).client,
         if_exists="append",
         progress_bar=True,
         table_schema=schema,
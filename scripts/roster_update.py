@@ -32,6 +32,8 @@ column_mappings = {
     "Homeroom": "homeroom",
 }
 
+projectColumns = compileProjection(tableSchema, column_mappings)
+
 # Get the entry ID from the user
 def getEntryID():
     # entryID = input(Fore.CYAN + "Enter the entry ID for this roster YYYYMMDDX: ")
@@ -50,11 +52,9 @@ def getEntryID():
 def cleanData(df):
     entryID = getEntryID()
 
-    # The data has 22 columns. I only need 3 of them. Drop the rest.
-    df = df[list(column_mappings.keys())]   # Keep only the columns we need
-    df = df.rename(columns=column_mappings)  # Rename the columns
-    
-    df['entryID'] = int(entryID)  # Add the entryID column with the user input value
+    # readCSV only reads the mapped columns of the 22 in the export.
+    # Rename them and add the entryID column in one pass
+    df = projectColumns(df, entryID=int(entryID))
 
     return df
 
@@ -65,8 +65,11 @@ def doWork():
     """
     print(Fore.YELLOW + f"Starting {scriptName} script...")
 
-    # Read in the first .csv file found
-    csv_file, rawDataFrame = readCSV(source_folder)
+    # Read in every .csv file found
+    csv_files, rawDataFrame = readCSV(source_folder, column_mappings=column_mappings, tableSchema=tableSchema)
+
+    if not csv_files:
+        return
 
     # Clean the data
     cleanedDataFrame = cleanData(rawDataFrame)
@@ -77,7 +80,7 @@ def doWork():
    
 
     # Archive the source file
-    archiveSourceFile(cleanedDataFrame, csv_file, source_folder, table_id)
+    archiveSourceFile(cleanedDataFrame, csv_files, source_folder, table_id)
 
     print(Fore.GREEN + f"{scriptName} data pull complete.")
 
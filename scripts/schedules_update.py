@@ -33,6 +33,8 @@ column_mappings = {
     "Schedule": "period",
 }
 
+projectColumns = compileProjection(tableSchema, column_mappings)
+
 # Get the entry ID from the user
 def getEntryID():
     # entryID = input(Fore.CYAN + "Enter the entry ID for this roster YYYYMMDDX: ")
@@ -55,34 +57,11 @@ def cleanData(df):
 
     print("Cleaning data...")
 
-    # Drop unnecessary columns
-    df.drop(
-        columns=[
-            "LastName",
-            "FirstName",
-            "MiddleName",
-            "SpecialEdStus",
-            "Grade",
-            "Homeroom",
-            "Inclusion?",
-            "SecType",
-            "Clssrm",
-            "Total",
-            "Max",
-        ],
-        inplace=True,
-        errors="ignore",
-    )
-
-    # Rename columns based on predefined mappings
-    df.rename(columns=column_mappings, inplace=True, errors="raise")
-
-    # Add 'entryID' column
-    df["entryID"] = getEntryID()
-
     # Add 'sy' & 'semester' columns
-    df["sy"] = "SY26"
-    df["semester"] = df["classCode"].apply(lambda x: "Other" if x[6] == "N" else "S1" if x[5] == "1" else "S2" if x[5] == "2" else None)
+    semester = df["Class"].apply(lambda x: "Other" if x[6] == "N" else "S1" if x[5] == "1" else "S2" if x[5] == "2" else None)
+
+    # Rename, add entryID, cast and order the columns in one pass
+    df = projectColumns(df, entryID=getEntryID(), sy=currentSchoolYear(), semester=semester)
 
     return df
 
@@ -94,19 +73,22 @@ def doWork():
     """
     print(Fore.YELLOW + f"Starting {scriptName} script...")
 
-    # Read in the first .csv file found
-    csv_file, rawDataFrame = readCSV(source_folder)
+    # Read in every .csv file found
+    csv_files, rawDataFrame = readCSV(source_folder, column_mappings=column_mappings, tableSchema=tableSchema)
+
+    if not csv_files:
+        return
 
     # Clean the data
     cleanedDataFrame = cleanData(rawDataFrame)
 
-    deleteAllDataFromTable(project_id, dataset_id, table_id)
+    deleteAllDataFromTable(project_id, dataset_id, table_id, df=cleanedDataFrame)
 
     # Upload the data to BigQuery
     uploadToBigQuery(cleanedDataFrame, tableSchema, project_id, dataset_id, table_id)
 
     # Archive the source file
-    archiveSourceFile(cleanedDataFrame, csv_file, source_folder, table_id)
+    archiveSourceFile(cleanedDataFrame, csv_files, source_folder, table_id)
 
 
     print(Fore.GREEN + f"{scriptName} data pull complete.")